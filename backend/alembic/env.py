@@ -5,7 +5,15 @@ from sqlmodel import SQLModel
 from alembic import context
 
 from app.core.config import settings
-from app.models import User, Task, Notification, PushSubscription
+from app.core.scheduler import JOBS_TABLE
+from app.models import (  # noqa: F401
+    User,
+    Task,
+    Notification,
+    PushSubscription,
+    UserDailyStats,
+    UserFeatureProfile,
+)
 
 # this is the Alembic Config object
 config = context.config
@@ -21,12 +29,18 @@ config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 target_metadata = SQLModel.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Leave tables owned by other components (APScheduler's job store) alone"""
+    return not (type_ == "table" and name == JOBS_TABLE)
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -39,13 +53,25 @@ def run_migrations_online() -> None:
     """Run migrations in 'online' mode."""
     from sqlmodel import create_engine
 
+    # Callers (e.g. tests) may hand over an existing connection
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
     connectable = create_engine(settings.DATABASE_URL)
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        _run_migrations(connection)
 
-        with context.begin_transaction():
-            context.run_migrations()
+
+def _run_migrations(connection) -> None:
+    context.configure(
+        connection=connection, target_metadata=target_metadata, include_object=include_object
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,103 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("password_hash", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("name", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("title", sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column("description", sqlmodel.sql.sqltypes.AutoString(length=2000), nullable=True),
+        sa.Column("priority", sa.Enum("LOW", "MEDIUM", "HIGH", name="priority"), nullable=False),
+        sa.Column("due_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("remind_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "status", sa.Enum("TODO", "IN_PROGRESS", "DONE", name="status"), nullable=False
+        ),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tasks_user_id", "tasks", ["user_id"])
+    op.create_index("ix_tasks_status", "tasks", ["status"])
+    op.create_index("ix_tasks_due_at", "tasks", ["due_at"])
+    op.create_index("ix_tasks_remind_at", "tasks", ["remind_at"])
+
+    op.create_table(
+        "notifications",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_id", sa.Integer(), nullable=True),
+        sa.Column("channel", sa.Enum("WEB_PUSH", "EMAIL", name="channel"), nullable=False),
+        sa.Column("scheduled_for", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("delivered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("payload_json", sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(["task_id"], ["tasks.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_notifications_user_id", "notifications", ["user_id"])
+    op.create_index("ix_notifications_channel", "notifications", ["channel"])
+    op.create_index("ix_notifications_scheduled_for", "notifications", ["scheduled_for"])
+
+    op.create_table(
+        "push_subscriptions",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("endpoint", sqlmodel.sql.sqltypes.AutoString(length=500), nullable=False),
+        sa.Column("p256dh", sqlmodel.sql.sqltypes.AutoString(length=200), nullable=False),
+        sa.Column("auth", sqlmodel.sql.sqltypes.AutoString(length=100), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_push_subscriptions_user_id", "push_subscriptions", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_push_subscriptions_user_id", table_name="push_subscriptions")
+    op.drop_table("push_subscriptions")
+    op.drop_index("ix_notifications_scheduled_for", table_name="notifications")
+    op.drop_index("ix_notifications_channel", table_name="notifications")
+    op.drop_index("ix_notifications_user_id", table_name="notifications")
+    op.drop_table("notifications")
+    op.drop_index("ix_tasks_remind_at", table_name="tasks")
+    op.drop_index("ix_tasks_due_at", table_name="tasks")
+    op.drop_index("ix_tasks_status", table_name="tasks")
+    op.drop_index("ix_tasks_user_id", table_name="tasks")
+    op.drop_table("tasks")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
+    sa.Enum(name="channel").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="status").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="priority").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,91 @@
+"""task query indexes
+
+Composite indexes matching how tasks are actually read: every query filters
+by user_id first, then orders by created_at (listing, per-day analytics) or
+filters by status/due_at (completed/overdue/upcoming analytics). The reminder
+scan gets a partial index covering only open reminders.
+
+On Postgres the indexes are built CONCURRENTLY so the migration does not
+block writes on a live tasks table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:30:00
+
+"""
+from contextlib import contextmanager
+from typing import Iterator, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING_REMINDER = "remind_at IS NOT NULL AND status != 'DONE'"
+
+
+@contextmanager
+def _concurrently() -> Iterator[bool]:
+    """CREATE/DROP INDEX CONCURRENTLY must run outside a transaction on Postgres"""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            yield True
+    else:
+        yield False
+
+
+def upgrade() -> None:
+    with _concurrently() as concurrently:
+        op.create_index(
+            "ix_tasks_user_id_created_at_id",
+            "tasks",
+            ["user_id", "created_at", "id"],
+            postgresql_concurrently=concurrently,
+        )
+        op.create_index(
+            "ix_tasks_user_id_status_due_at",
+            "tasks",
+            ["user_id", "status", "due_at"],
+            postgresql_concurrently=concurrently,
+        )
+        op.create_index(
+            "ix_tasks_pending_remind_at",
+            "tasks",
+            ["remind_at"],
+            postgresql_where=sa.text(PENDING_REMINDER),
+            sqlite_where=sa.text(PENDING_REMINDER),
+            postgresql_concurrently=concurrently,
+        )
+
+        # Superseded by the indexes above
+        op.drop_index("ix_tasks_user_id", table_name="tasks", postgresql_concurrently=concurrently)
+        op.drop_index("ix_tasks_status", table_name="tasks", postgresql_concurrently=concurrently)
+        op.drop_index("ix_tasks_remind_at", table_name="tasks", postgresql_concurrently=concurrently)
+
+
+def downgrade() -> None:
+    with _concurrently() as concurrently:
+        op.create_index(
+            "ix_tasks_remind_at", "tasks", ["remind_at"], postgresql_concurrently=concurrently
+        )
+        op.create_index(
+            "ix_tasks_status", "tasks", ["status"], postgresql_concurrently=concurrently
+        )
+        op.create_index(
+            "ix_tasks_user_id", "tasks", ["user_id"], postgresql_concurrently=concurrently
+        )
+
+        op.drop_index(
+            "ix_tasks_pending_remind_at", table_name="tasks", postgresql_concurrently=concurrently
+        )
+        op.drop_index(
+            "ix_tasks_user_id_status_due_at", table_name="tasks", postgresql_concurrently=concurrently
+        )
+        op.drop_index(
+            "ix_tasks_user_id_created_at_id", table_name="tasks", postgresql_concurrently=concurrently
+        )
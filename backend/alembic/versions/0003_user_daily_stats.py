@@ -0,0 +1,36 @@
+"""user daily stats rollup
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Populate with `python scripts/rebuild_stats.py` after upgrading
+    op.create_table(
+        "user_daily_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("created_count", sa.Integer(), nullable=False),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.Column("open_due_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id", "day"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_daily_stats")
@@ -0,0 +1,39 @@
+"""user feature profiles
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 12:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Profiles are built lazily on first use; `python scripts/rebuild_stats.py`
+    # backfills them eagerly
+    op.create_table(
+        "user_feature_profiles",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("total_tasks", sa.Integer(), nullable=False),
+        sa.Column("low_count", sa.Integer(), nullable=False),
+        sa.Column("medium_count", sa.Integer(), nullable=False),
+        sa.Column("high_count", sa.Integer(), nullable=False),
+        sa.Column("completion_hours", sa.JSON(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_feature_profiles")
@@ -0,0 +1,31 @@
+"""task reminder_sent_for claim marker
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Marks which remind_at a reminder was claimed for. Nothing needs to be
+    # enqueued by hand: 0006 stamps reminders already sent, and the sliding-
+    # window loader picks up the pending ones when the app starts
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.add_column(sa.Column("reminder_sent_for", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tasks") as batch_op:
+        batch_op.drop_column("reminder_sent_for")
@@ -0,0 +1,32 @@
+"""mark past reminders as sent
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 14:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The reminder window loader catches up on unsent reminders from the last
+    # REMINDER_CATCHUP_HOURS. Reminders already delivered before the claim
+    # marker existed have no marker, so stamp them rather than resend them.
+    op.execute(
+        "UPDATE tasks SET reminder_sent_for = remind_at "
+        "WHERE remind_at < CURRENT_TIMESTAMP AND reminder_sent_for IS NULL"
+    )
+
+
+def downgrade() -> None:
+    # Data-only revision: the stamps are harmless under the previous code
+    pass
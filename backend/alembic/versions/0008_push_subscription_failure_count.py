@@ -0,0 +1,30 @@
+"""push subscription failure count
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("push_subscriptions") as batch_op:
+        batch_op.add_column(
+            sa.Column("failure_count", sa.Integer(), nullable=False, server_default="0")
+        )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("push_subscriptions") as batch_op:
+        batch_op.drop_column("failure_count")
@@ -0,0 +1,55 @@
+"""timestamps with time zone on legacy databases
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Timestamp columns 0001 declares with time zone. Databases created by
+# create_all before migrations existed, and stamped at 0001, have them
+# without one, and asyncpg rejects the aware datetimes the app binds.
+LEGACY_COLUMNS = {
+    "users": ["created_at"],
+    "tasks": ["due_at", "remind_at", "created_at", "updated_at"],
+    "notifications": ["scheduled_for", "delivered_at"],
+    "push_subscriptions": ["created_at"],
+}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return  # SQLite has no separate type for aware timestamps
+    inspector = sa.inspect(bind)
+    for table, columns in LEGACY_COLUMNS.items():
+        naive = {
+            column["name"]
+            for column in inspector.get_columns(table)
+            if isinstance(column["type"], sa.DateTime) and not column["type"].timezone
+        }
+        for column in columns:
+            if column in naive:
+                # The app always wrote UTC, so read the naive values as UTC
+                op.alter_column(
+                    table,
+                    column,
+                    type_=sa.DateTime(timezone=True),
+                    postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                )
+
+
+def downgrade() -> None:
+    # 0001 already declares these columns with time zone; nothing to undo
+    pass
@@ -1,22 +1,27 @@
 """AI suggestion endpoints"""
 
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, Body, Depends
+from pydantic import BaseModel, Field
 from typing import Optional
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from app.db import get_session
 from app.api.auth import get_current_user_dependency
 from app.models.user import User
-from app.services.ai_service import get_ai_suggestions
+from app.services.ai_service import get_ai_suggestions, get_ai_suggestions_batch, ml_status
 
 router = APIRouter()
 
+# Upper bound on drafts scored by one batch request
+MAX_BATCH_SIZE = 100
+
 
 class TaskContext(BaseModel):
     """Task context for AI suggestions"""
 
     title: Optional[str] = None
     description: Optional[str] = None
-    estimated_duration_minutes: Optional[int] = None
+    estimated_duration_minutes: Optional[int] = Field(default=None, gt=0, le=24 * 60)
 
 
 class AISuggestionResponse(BaseModel):
@@ -32,9 +37,10 @@ class AISuggestionResponse(BaseModel):
 async def suggest_task_priority_and_time(
     task_context: Optional[TaskContext] = None,
     user: User = Depends(get_current_user_dependency),
+    session: AsyncSession = Depends(get_session),
 ) -> AISuggestionResponse:
     """Get AI suggestions for task priority and optimal time slots"""
-    suggestions = await get_ai_suggestions(user.id, task_context)
+    suggestions = await get_ai_suggestions(session, user.id, task_context)
 
     return AISuggestionResponse(
         suggested_priority=suggestions["priority"],
@@ -43,3 +49,29 @@ async def suggest_task_priority_and_time(
         reasoning=suggestions["reasoning"],
     )
 
+
+
+@router.post("/suggest/batch", response_model=list[AISuggestionResponse])
+async def suggest_batch(
+    task_contexts: list[TaskContext] = Body(..., max_length=MAX_BATCH_SIZE),
+    user: User = Depends(get_current_user_dependency),
+    session: AsyncSession = Depends(get_session),
+) -> list[AISuggestionResponse]:
+    """Get AI suggestions for many draft tasks in one call (bulk import, triage)"""
+    suggestions = await get_ai_suggestions_batch(session, user.id, task_contexts)
+
+    return [
+        AISuggestionResponse(
+            suggested_priority=suggestion["priority"],
+            priority_reason=suggestion["priority_reason"],
+            suggested_time_slots=suggestion["time_slots"],
+            reasoning=suggestion["reasoning"],
+        )
+        for suggestion in suggestions
+    ]
+
+
+@router.get("/status")
+async def get_ai_status(user: User = Depends(get_current_user_dependency)) -> dict:
+    """Whether the optional ML backend is installed and loaded in this worker"""
+    return ml_status()
@@ -1,80 +1,124 @@
 """Analytics endpoints"""
 
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session, select, func, and_
+from fastapi import APIRouter, Depends, Response
+from sqlalchemy import case
+from sqlmodel import select, func, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db import get_session
 from app.models.user import User
 from app.models.task import Task, Status
+from app.models.user_daily_stats import UserDailyStats
 from app.api.auth import get_current_user_dependency
+from app.services.analytics_cache import (
+    UPCOMING_WINDOW,
+    cache_summary,
+    get_cached_summary,
+    user_data_version,
+)
 
 router = APIRouter()
 
 
+def _sum_where(column, *conditions):
+    """Conditional aggregate: sum of column over rows matching all conditions"""
+    return func.coalesce(func.sum(case((and_(*conditions), column), else_=0)), 0)
+
+
 @router.get("/summary")
 async def get_analytics_summary(
+    response: Response,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> dict:
-    """Get analytics summary for the user"""
+    """
+    Get analytics summary for the user
+    Served from the versioned response cache until the user's tasks change
+    (one primary key lookup of users.data_version). Otherwise counts and the
+    per-day histogram are read from the user_daily_stats rollup in one
+    aggregate query, so cost scales with days rather than tasks; upcoming
+    deadlines are a second, indexed query.
+    """
+    version = await user_data_version(session, user.id)
+    cached = get_cached_summary(user.id, version)
+    if cached is not None:
+        response.headers["X-Cache"] = "HIT"
+        return cached
+
     now = datetime.now(timezone.utc)
+    today = now.date()
+    today_start = datetime.combine(today, time.min, tzinfo=timezone.utc)
+    upcoming_end = now + UPCOMING_WINDOW
 
-    # Total tasks
-    total_statement = select(func.count(Task.id)).where(Task.user_id == user.id)
-    total_tasks = session.exec(total_statement).one() or 0
+    # Tasks per day: today and the 14 UTC calendar days before it (the
+    # rollup has no time of day, so this is not a rolling 14x24h window)
+    window = [today - timedelta(days=offset) for offset in range(14, -1, -1)]
 
-    # Completed tasks
-    completed_statement = select(func.count(Task.id)).where(
-        Task.user_id == user.id, Task.status == Status.DONE
+    # Rollup rows only know the due day; overdue tasks due earlier today
+    # are counted from the tasks table (bounded to one day via the index)
+    overdue_today = (
+        select(func.count(Task.id))
+        .where(
+            Task.user_id == user.id,
+            Task.status != Status.DONE,
+            Task.due_at >= today_start,
+            Task.due_at < now,
+        )
+        .scalar_subquery()
     )
-    completed_tasks = session.exec(completed_statement).one() or 0
 
-    # Overdue tasks
-    overdue_statement = select(func.count(Task.id)).where(
-        Task.user_id == user.id,
-        Task.due_at < now,
-        Task.status != Status.DONE,
-    )
-    overdue_tasks = session.exec(overdue_statement).one() or 0
-
-    # Tasks per day (last 14 days)
-    fourteen_days_ago = now - timedelta(days=14)
-    tasks_per_day_statement = (
-        select(
-            func.date(Task.created_at).label("date"),
-            func.count(Task.id).label("count"),
-        )
+    # The next open deadline beyond the upcoming window, for cache expiry
+    next_beyond_window = (
+        select(func.min(Task.due_at))
         .where(
             Task.user_id == user.id,
-            Task.created_at >= fourteen_days_ago,
+            Task.status != Status.DONE,
+            Task.due_at > upcoming_end,
         )
-        .group_by(func.date(Task.created_at))
-        .order_by(func.date(Task.created_at))
+        .scalar_subquery()
     )
 
-    tasks_per_day = {}
-    for row in session.exec(tasks_per_day_statement).all():
-        date_str = row.date.isoformat() if hasattr(row.date, "isoformat") else str(row.date)
-        tasks_per_day[date_str] = row.count
+    stats = UserDailyStats
+    counts_statement = select(
+        func.coalesce(func.sum(stats.created_count), 0),
+        func.coalesce(func.sum(stats.completed_count), 0),
+        _sum_where(stats.open_due_count, stats.day < today),
+        overdue_today,
+        next_beyond_window,
+        *(_sum_where(stats.created_count, stats.day == day) for day in window),
+    ).where(stats.user_id == user.id)
+
+    (
+        total_tasks,
+        completed_tasks,
+        overdue_before_today,
+        overdue_today_count,
+        enters_window_at,
+        *per_day_counts,
+    ) = (await session.exec(counts_statement)).one()
+    overdue_tasks = overdue_before_today + overdue_today_count
+
+    tasks_per_day = {
+        day.isoformat(): count for day, count in zip(window, per_day_counts) if count
+    }
 
     # Upcoming deadlines (next 7 days)
-    seven_days_from_now = now + timedelta(days=7)
     upcoming_statement = (
         select(Task)
         .where(
             Task.user_id == user.id,
             Task.due_at >= now,
-            Task.due_at <= seven_days_from_now,
+            Task.due_at <= upcoming_end,
             Task.status != Status.DONE,
         )
         .order_by(Task.due_at)
         .limit(10)
     )
 
-    upcoming_tasks = session.exec(upcoming_statement).all()
+    upcoming_tasks = (await session.exec(upcoming_statement)).all()
     upcoming_deadlines = [
         {
             "id": task.id,
@@ -85,7 +129,7 @@ async def get_analytics_summary(
         for task in upcoming_tasks
     ]
 
-    return {
+    summary = {
         "total_tasks": total_tasks,
         "completed_tasks": completed_tasks,
         "overdue_tasks": overdue_tasks,
@@ -94,3 +138,6 @@ async def get_analytics_summary(
         "upcoming_deadlines": upcoming_deadlines,
     }
 
+    cache_summary(user.id, version, summary, now, enters_window_at)
+    response.headers["X-Cache"] = "MISS"
+    return summary
@@ -1,15 +1,22 @@
 """Authentication endpoints"""
 
+from datetime import datetime, timezone
+
 from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlmodel import Session, select
+from sqlalchemy import event
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import Optional
 
 from app.db import get_session
 from app.models.user import User
 from app.schemas.auth import UserRegister, UserLogin, TokenResponse, RefreshTokenRequest, UserResponse
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    PasswordHasherBusyError,
+    verify_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -17,13 +24,39 @@ from app.core.security import (
 
 router = APIRouter()
 
+PASSWORD_HASHER_BUSY_RETRY_AFTER_SECONDS = 1
+
+# Access token -> detached User snapshot, so repeat callers skip the user lookup
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id: Optional[int]) -> None:
+    """Drop every cached token that resolves to the given user"""
+    user_cache.invalidate_where(lambda _token, user: user.id == user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_user_change(mapper, connection, target: User) -> None:
+    """Keep the user cache coherent when a user row is changed or removed"""
+    invalidate_cached_user(target.id)
+
+
+def _password_hasher_busy() -> HTTPException:
+    """503 telling clients to back off while the hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent login attempts, please retry shortly",
+        headers={"Retry-After": str(PASSWORD_HASHER_BUSY_RETRY_AFTER_SECONDS)},
+    )
+
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, session: Session = Depends(get_session)) -> UserResponse:
+async def register(user_data: UserRegister, session: AsyncSession = Depends(get_session)) -> UserResponse:
     """Register a new user"""
     # Check if user exists
     statement = select(User).where(User.email == user_data.email)
-    existing_user = session.exec(statement).first()
+    existing_user = (await session.exec(statement)).first()
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,14 +64,19 @@ async def register(user_data: UserRegister, session: Session = Depends(get_sessi
         )
 
     # Create user
+    try:
+        password_hash = await get_password_hash_async(user_data.password)
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
+
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=password_hash,
         name=user_data.name,
     )
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    await session.commit()
+    await session.refresh(user)
 
     return UserResponse(
         id=user.id or 0,
@@ -49,12 +87,19 @@ async def register(user_data: UserRegister, session: Session = Depends(get_sessi
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin, session: Session = Depends(get_session)) -> TokenResponse:
+async def login(credentials: UserLogin, session: AsyncSession = Depends(get_session)) -> TokenResponse:
     """Login and get access/refresh tokens"""
     statement = select(User).where(User.email == credentials.email)
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
+
+    try:
+        password_ok = user is not None and await verify_password_async(
+            credentials.password, user.password_hash
+        )
+    except PasswordHasherBusyError:
+        raise _password_hasher_busy()
 
-    if not user or not verify_password(credentials.password, user.password_hash):
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -93,7 +138,7 @@ async def refresh_token(request: RefreshTokenRequest) -> TokenResponse:
 
 async def get_current_user_dependency(
     authorization: Optional[str] = Header(None, alias="Authorization"),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> User:
     """Get current user from JWT token"""
     if not authorization:
@@ -116,6 +161,10 @@ async def get_current_user_dependency(
             detail="Invalid authorization header",
         )
 
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     payload = decode_token(token)
     if not payload or payload.get("type") != "access":
         raise HTTPException(
@@ -131,14 +180,20 @@ async def get_current_user_dependency(
         )
 
     statement = select(User).where(User.id == int(user_id))
-    user = session.exec(statement).first()
+    user = (await session.exec(statement)).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
 
-    return user
+    # Cache a detached copy so later commits in this session can't expire it,
+    # and never keep it past the token's own expiry
+    snapshot = User(**user.model_dump())
+    expires_in = payload["exp"] - datetime.now(timezone.utc).timestamp()
+    user_cache.set(token, snapshot, ttl=expires_in)
+
+    return snapshot
 
 
 @router.get("/me", response_model=UserResponse)
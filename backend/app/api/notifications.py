@@ -1,13 +1,15 @@
 """Notification endpoints"""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db import get_session
 from app.models.user import User
 from app.models.push_subscription import PushSubscription
 from app.api.auth import get_current_user_dependency
 from app.core.config import settings
+from app.services.web_push import valid_subscription_keys
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -33,9 +35,17 @@ async def get_vapid_public_key() -> dict:
 async def subscribe_to_push(
     subscription: PushSubscriptionRequest,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> dict:
     """Subscribe user to Web Push notifications"""
+    p256dh = subscription.keys.get("p256dh", "")
+    auth = subscription.keys.get("auth", "")
+    if not valid_subscription_keys(p256dh, auth):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="keys must hold a P-256 p256dh key and a 16-byte auth secret",
+        )
+
     # Check if subscription already exists
     from sqlmodel import select
 
@@ -43,23 +53,24 @@ async def subscribe_to_push(
         PushSubscription.user_id == user.id,
         PushSubscription.endpoint == subscription.endpoint,
     )
-    existing = session.exec(statement).first()
+    existing = (await session.exec(statement)).first()
 
     if existing:
         # Update existing
-        existing.p256dh = subscription.keys.get("p256dh", "")
-        existing.auth = subscription.keys.get("auth", "")
+        existing.p256dh = p256dh
+        existing.auth = auth
+        existing.failure_count = 0  # The browser renewed it
         session.add(existing)
     else:
         # Create new
         push_sub = PushSubscription(
             user_id=user.id or 0,
             endpoint=subscription.endpoint,
-            p256dh=subscription.keys.get("p256dh", ""),
-            auth=subscription.keys.get("auth", ""),
+            p256dh=p256dh,
+            auth=auth,
         )
         session.add(push_sub)
 
-    session.commit()
+    await session.commit()
 
     return {"status": "subscribed"}
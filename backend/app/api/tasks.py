@@ -1,10 +1,14 @@
 """Task endpoints"""
 
+import base64
+import binascii
+import json
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, or_, and_
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlmodel import select, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.db import get_session
 from app.models.user import User
@@ -15,19 +19,47 @@ from app.services.task_service import create_task_with_reminder, update_task_wit
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_cursor(task: Task) -> str:
+    """Opaque cursor pointing just past the given task in (created_at, id) order"""
+    raw = json.dumps([task.created_at.isoformat(), task.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by _encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
 
 @router.get("", response_model=list[TaskResponse])
 async def list_tasks(
+    response: Response,
     status_filter: Optional[Status] = Query(None, alias="status"),
     priority: Optional[Priority] = Query(None),
     due_from: Optional[datetime] = Query(None),
     due_to: Optional[datetime] = Query(None),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> list[TaskResponse]:
-    """List tasks with filters and pagination"""
+    """
+    List tasks with filters and pagination
+    Pass the X-Next-Cursor response header back as `cursor` for keyset
+    pagination; `page` is kept for backward compatibility and ignored
+    when a cursor is given.
+    """
     statement = select(Task).where(Task.user_id == user.id)
 
     if status_filter:
@@ -39,10 +71,25 @@ async def list_tasks(
     if due_to:
         statement = statement.where(Task.due_at <= due_to)
 
-    statement = statement.order_by(Task.created_at.desc())
-    statement = statement.offset((page - 1) * size).limit(size)
+    if cursor:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        statement = statement.where(
+            or_(
+                Task.created_at < cursor_created_at,
+                and_(Task.created_at == cursor_created_at, Task.id < cursor_id),
+            )
+        )
+
+    # id breaks ties between tasks created in the same instant
+    statement = statement.order_by(Task.created_at.desc(), Task.id.desc())
+    if not cursor:
+        statement = statement.offset((page - 1) * size)
+    statement = statement.limit(size)
+
+    tasks = (await session.exec(statement)).all()
+    if len(tasks) == size:
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(tasks[-1])
 
-    tasks = session.exec(statement).all()
     return [TaskResponse.model_validate(task) for task in tasks]
 
 
@@ -50,7 +97,7 @@ async def list_tasks(
 async def create_task(
     task_data: TaskCreate,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> TaskResponse:
     """Create a new task"""
     # Validate remind_at <= due_at
@@ -69,11 +116,11 @@ async def create_task(
 async def get_task(
     task_id: int,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> TaskResponse:
     """Get a task by ID"""
     statement = select(Task).where(Task.id == task_id, Task.user_id == user.id)
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).first()
 
     if not task:
         raise HTTPException(
@@ -89,11 +136,11 @@ async def update_task(
     task_id: int,
     task_data: TaskUpdate,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> TaskResponse:
     """Update a task"""
     statement = select(Task).where(Task.id == task_id, Task.user_id == user.id)
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).first()
 
     if not task:
         raise HTTPException(
@@ -119,11 +166,11 @@ async def update_task(
 async def delete_task(
     task_id: int,
     user: User = Depends(get_current_user_dependency),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     """Delete a task"""
     statement = select(Task).where(Task.id == task_id, Task.user_id == user.id)
-    task = session.exec(statement).first()
+    task = (await session.exec(statement)).first()
 
     if not task:
         raise HTTPException(
@@ -17,9 +17,62 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASS: str = ""
+    SMTP_STARTTLS: bool = True
+    # Connections are kept open and reused across messages
+    SMTP_POOL_SIZE: int = 10
+    SMTP_IDLE_TIMEOUT_SECONDS: float = 60.0
+    SMTP_MAX_MESSAGES_PER_CONNECTION: int = 100
+    SMTP_TIMEOUT_SECONDS: float = 30.0
     FRONTEND_ORIGIN: str = "http://localhost:5173"
     VAPID_PUBLIC_KEY: str = ""
     VAPID_PRIVATE_KEY: str = ""
+    VAPID_SUBJECT: str = "mailto:admin@example.com"
+    # How long push services keep an undelivered reminder for offline devices
+    WEB_PUSH_TTL_SECONDS: int = 3600
+    WEB_PUSH_TIMEOUT_SECONDS: float = 10.0
+    WEB_PUSH_MAX_CONNECTIONS: int = 100
+    # Subscriptions failing this many deliveries in a row are no longer
+    # pushed to, and are deleted by the periodic sweep
+    PUSH_SUBSCRIPTION_MAX_FAILURES: int = 5
+    PUSH_SUBSCRIPTION_SWEEP_MINUTES: int = 60
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    ANALYTICS_CACHE_SIZE: int = 10000
+    ANALYTICS_CACHE_TTL_SECONDS: int = 60
+    MODEL_STORE_DIR: str = "./models"
+    MODEL_CACHE_SIZE: int = 1000
+    MODEL_CACHE_TTL_SECONDS: int = 3600
+    # Users without a model are re-checked this often, so a newly trained
+    # model is picked up without waiting for MODEL_CACHE_TTL_SECONDS
+    MODEL_MISS_CACHE_TTL_SECONDS: int = 60
+    SLOT_CACHE_SIZE: int = 10000
+    SLOT_CACHE_TTL_SECONDS: int = 3600
+    MODEL_INFERENCE_BUDGET_MS: float = 10.0
+    MODEL_MIN_TASKS: int = 20
+    ML_WARMUP_ON_STARTUP: bool = True
+    URGENCY_LEXICON_PATH: str = ""
+    # Reminders are scheduled in memory only once inside this window; the
+    # loader interval must stay well below it
+    REMINDER_WINDOW_MINUTES: int = 15
+    REMINDER_LOADER_INTERVAL_SECONDS: int = 60
+    REMINDER_CATCHUP_HOURS: int = 24
+    # Leases are renewed by every loader run; a dead worker's reminders are
+    # taken over once its leases expire
+    REMINDER_LEASE_SECONDS: int = 180
+    REMINDER_CLAIM_BATCH: int = 1000
+    # Reminders firing this close together are sent as one batch
+    REMINDER_BATCH_WINDOW_SECONDS: float = 0.25
+    REMINDER_BATCH_SIZE: int = 500
+    # Concurrent deliveries per channel, and how many may wait per channel
+    # before reminder batches are held back
+    PUSH_CONCURRENCY: int = 50
+    EMAIL_CONCURRENCY: int = 10
+    DELIVERY_QUEUE_SIZE: int = 1000
+    # Off for API processes when a separate worker (python -m app.worker)
+    # runs the scheduler and delivers reminders
+    RUN_SCHEDULER: bool = True
 
 
 settings = Settings()
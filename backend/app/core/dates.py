@@ -0,0 +1,22 @@
+"""Datetime helpers"""
+
+from datetime import date, datetime, timezone
+from typing import Optional
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """
+    Normalize a datetime to aware UTC
+    Naive values are what SQLite hands back for UTC timestamps, so they are
+    taken to already be in UTC.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def utc_day(value: datetime) -> date:
+    """Calendar day of a timestamp in UTC"""
+    return as_utc(value).date()
@@ -1,16 +1,180 @@
-"""Email notification service (placeholder for SMTP)"""
+"""Email notification service over pooled SMTP connections"""
 
+import asyncio
+import functools
 import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Optional
 
 from app.core.config import settings
 
 
+class _Connection:
+    __slots__ = ("smtp", "sent", "last_used")
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPPool:
+    """
+    Reusable, authenticated SMTP connections
+    Saves the connect, STARTTLS handshake and login per message. At most
+    `size` connections exist, one per thread of the pool's own executor;
+    idle ones older than `idle_timeout` seconds are closed instead of reused,
+    and each is retired after `max_messages`. A send that hits a dropped
+    connection is retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        starttls: bool = True,
+        size: int = 10,
+        idle_timeout: float = 60.0,
+        max_messages: int = 100,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.idle_timeout = idle_timeout
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._idle: list[_Connection] = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="smtp")
+        self.sent = 0
+        self.connections_opened = 0
+        self.reconnects = 0
+
+    def _connect(self) -> _Connection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password)
+        except BaseException:
+            smtp.close()
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return _Connection(smtp)
+
+    @staticmethod
+    def _close(connection: _Connection) -> None:
+        try:
+            connection.smtp.quit()
+        except OSError:  # Includes SMTPException
+            connection.smtp.close()
+
+    def _checkout(self) -> _Connection:
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._connect()
+            if time.monotonic() - connection.last_used < self.idle_timeout:
+                return connection
+            self._close(connection)  # The server has likely dropped it already
+
+    def _checkin(self, connection: _Connection) -> None:
+        if connection.sent >= self.max_messages:
+            self._close(connection)
+            return
+        connection.last_used = time.monotonic()
+        with self._lock:
+            self._idle.append(connection)
+
+    def send(self, msg: MIMEMultipart) -> None:
+        """Send one message, blocking; raises if it could not be sent"""
+        for attempt in range(2):
+            connection = self._checkout()
+            try:
+                connection.smtp.send_message(msg)
+            except smtplib.SMTPServerDisconnected as e:
+                error = e
+            except smtplib.SMTPException:
+                # Refused message or recipients, but the connection is still
+                # usable; sending again would fail the same way
+                connection.sent += 1
+                self._checkin(connection)
+                raise
+            except OSError as e:
+                error = e
+            else:
+                connection.sent += 1
+                self._checkin(connection)
+                with self._lock:
+                    self.sent += 1
+                return
+
+            # Dropped connection (SMTPServerDisconnected, timeouts, resets)
+            connection.smtp.close()
+            if attempt:
+                raise error
+            with self._lock:
+                self.reconnects += 1
+
+    async def send_async(self, msg: MIMEMultipart) -> None:
+        """Send on the pool's executor, keeping smtplib off the event loop"""
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.send, msg)
+
+    def close(self) -> None:
+        """Wait for sends in progress, then quit every idle connection"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sent": self.sent,
+                "connections_opened": self.connections_opened,
+                "reconnects": self.reconnects,
+                "idle": len(self._idle),
+            }
+
+
+@functools.cache
+def smtp_pool() -> SMTPPool:
+    """The process-wide SMTP pool, created from settings on first use"""
+    return SMTPPool(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        settings.SMTP_USER,
+        settings.SMTP_PASS,
+        starttls=settings.SMTP_STARTTLS,
+        size=settings.SMTP_POOL_SIZE,
+        idle_timeout=settings.SMTP_IDLE_TIMEOUT_SECONDS,
+        max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+    )
+
+
+def close_smtp_pool() -> None:
+    """Close the pool if it was ever used (shutdown)"""
+    if smtp_pool.cache_info().currsize:
+        smtp_pool().close()
+        smtp_pool.cache_clear()
+
+
 async def send_email(to: str, subject: str, body: str) -> bool:
     """
-    Send email notification (placeholder implementation)
+    Send email notification
     Returns True if sent successfully, False otherwise
     """
     if not settings.SMTP_HOST or not settings.SMTP_USER:
@@ -25,13 +189,8 @@ async def send_email(to: str, subject: str, body: str) -> bool:
         msg["Subject"] = subject
         msg.attach(MIMEText(body, "html"))
 
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASS)
-            server.send_message(msg)
-
+        await smtp_pool().send_async(msg)
         return True
     except Exception as e:
         print(f"Failed to send email: {e}")
         return False
-
@@ -1,10 +1,28 @@
 """APScheduler configuration"""
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from sqlalchemy.engine import Engine
 
-scheduler = BackgroundScheduler(
-    jobstores={"default": MemoryJobStore()},
-    timezone="UTC",
-)
+from app.db import engine
 
+# Table APScheduler creates and owns in our database (not managed by Alembic)
+JOBS_TABLE = "apscheduler_jobs"
+
+
+def create_scheduler(bind: Engine) -> BackgroundScheduler:
+    """
+    Scheduler whose default job store lives in the database behind `bind`
+    A restart neither loses nor has to rebuild those jobs. Jobs that came due
+    while the process was down still run once (no grace limit, missed runs
+    coalesced). Reminders don't use it: they run on the event loop's timer
+    wheel (see app/jobs/reminder_job.py).
+    """
+    return BackgroundScheduler(
+        jobstores={"default": SQLAlchemyJobStore(engine=bind, tablename=JOBS_TABLE)},
+        job_defaults={"misfire_grace_time": None, "coalesce": True},
+        timezone="UTC",
+    )
+
+
+scheduler = create_scheduler(engine)
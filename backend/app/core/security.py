@@ -1,7 +1,10 @@
 """Security utilities for password hashing and JWT tokens"""
 
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -21,6 +24,73 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasherBusyError(Exception):
+    """Raised when the password hashing queue is full"""
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+    At most `workers + queue_limit` calls may be pending; beyond that, calls are
+    rejected with PasswordHasherBusyError instead of queueing without bound.
+    """
+
+    def __init__(self, workers: int, queue_limit: int) -> None:
+        self.workers = workers
+        self.capacity = workers + queue_limit
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool, or raise PasswordHasherBusyError if saturated"""
+        with self._lock:
+            if self._pending >= self.capacity:
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._pending += 1
+            executor = self._get_executor()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (they are recreated on next use)"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash without blocking the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
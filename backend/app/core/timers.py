@@ -0,0 +1,120 @@
+"""Hashed timing wheel for many one-shot timers on the asyncio event loop"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Callable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class _Timer:
+    __slots__ = ("key", "deadline", "tick", "callback", "args")
+
+    def __init__(self, key: str, deadline: float, tick: int, callback: Callable, args: tuple):
+        self.key = key
+        self.deadline = deadline
+        self.tick = tick
+        self.callback = callback
+        self.args = args
+
+
+class TimerWheel:
+    """
+    One-shot timers keyed by name, fired on the asyncio loop
+    Timers hash into `slots` buckets by tick (deadline // tick), so schedule,
+    cancel and reschedule are O(1) dict operations however many are pending;
+    each tick only visits one bucket, where timers a revolution or more away
+    wait for their round. Deadlines are wall-clock timestamps and fire at most
+    one tick late. Not thread-safe: call it from the loop's thread.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 1024):
+        self.tick = tick
+        self._buckets: list[dict[str, _Timer]] = [{} for _ in range(slots)]
+        self._timers: dict[str, _Timer] = {}
+        self._current = self._tick_of(time.time())  # last tick processed
+        self._handle: Optional[asyncio.TimerHandle] = None
+
+    def _tick_of(self, timestamp: float) -> int:
+        return math.floor(timestamp / self.tick)
+
+    def _bucket(self, tick: int) -> dict[str, _Timer]:
+        return self._buckets[tick % len(self._buckets)]
+
+    def schedule(self, key: str, deadline: float, callback: Callable, *args: Any) -> None:
+        """Add a timer, replacing any pending one with the same key"""
+        self.cancel(key)
+        # Already due: fire on the next tick
+        tick = max(self._tick_of(deadline), self._current + 1)
+        timer = _Timer(key, deadline, tick, callback, args)
+        self._timers[key] = timer
+        self._bucket(tick)[key] = timer
+
+    def cancel(self, key: str) -> bool:
+        """Drop a pending timer; returns whether there was one"""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        del self._bucket(timer.tick)[key]
+        return True
+
+    def deadline(self, key: str) -> Optional[float]:
+        timer = self._timers.get(key)
+        return timer.deadline if timer else None
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._timers
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._timers)
+
+    def advance(self, now: float) -> int:
+        """Fire every timer due by `now`; returns how many fired"""
+        target = self._tick_of(now)
+        # After a stall of a revolution or more each bucket is visited once
+        last = min(target, self._current + len(self._buckets))
+        due = []
+        for tick in range(self._current + 1, last + 1):
+            bucket = self._bucket(tick)
+            for timer in [timer for timer in bucket.values() if timer.tick <= target]:
+                del bucket[timer.key]
+                del self._timers[timer.key]
+                due.append(timer)
+
+        # Timers the callbacks schedule land after this tick
+        self._current = max(self._current, target)
+        for timer in due:
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                logger.exception("Timer %s failed", timer.key)
+        return len(due)
+
+    @property
+    def running(self) -> bool:
+        return self._handle is not None
+
+    def start(self) -> None:
+        """Start ticking on the running event loop"""
+        if self._handle is None:
+            self._tick_later(asyncio.get_running_loop())
+
+    def stop(self) -> None:
+        """Stop ticking; pending timers are kept"""
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _tick_later(self, loop: asyncio.AbstractEventLoop) -> None:
+        delay = max((self._current + 1) * self.tick - time.time(), 0)
+        self._handle = loop.call_later(delay, self._run, loop)
+
+    def _run(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.advance(time.time())
+        if self._handle is not None:  # not stopped by a callback
+            self._tick_later(loop)
@@ -1,23 +1,71 @@
 """Database configuration and session management"""
 
-from sqlmodel import SQLModel, create_engine, Session
+from typing import AsyncIterator
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 
+
+def async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto its async driver (aiosqlite / asyncpg)"""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Sync engine: only for code that runs outside the event loop
+# (APScheduler job threads, Alembic, CLI scripts)
 engine = create_engine(
     settings.DATABASE_URL,
     connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
     echo=settings.APP_ENV == "dev",
 )
 
+# Async engine: used by every request handler and service
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    echo=settings.APP_ENV == "dev",
+)
 
-def get_session() -> Session:
+async_session_factory = async_sessionmaker(
+    async_engine, class_=AsyncSession, expire_on_commit=False
+)
+
+
+def dialect_insert(session: AsyncSession):
+    """`insert` supporting ON CONFLICT for the session's backend (Postgres or SQLite)"""
+    if session.bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
     """Dependency for getting database session"""
-    with Session(engine) as session:
+    async with async_session_factory() as session:
         yield session
 
 
 async def init_db() -> None:
-    """Initialize database tables"""
-    SQLModel.metadata.create_all(engine)
+    """
+    Initialize database tables for local development
+    Outside dev the schema is owned by Alembic (`alembic upgrade head`)
+    """
+    if settings.APP_ENV != "dev":
+        return
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    # Analytics reads only the rollup; fill it for tasks that predate it
+    from app.services.stats_service import backfill_user_daily_stats
 
+    async with async_session_factory() as session:
+        await backfill_user_daily_stats(session)
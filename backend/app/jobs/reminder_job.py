@@ -1,27 +1,175 @@
 """Reminder job that fires when task reminder time is reached"""
 
-from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 
+from sqlalchemy import and_, insert, or_, update
 from sqlmodel import Session, select
 
+from app.core.config import settings
+from app.core.dates import as_utc
+from app.core.email import close_smtp_pool
+from app.core.timers import TimerWheel
 from app.db import engine
-from app.models.task import Task
+from app.models.task import Task, Status
 from app.models.notification import Notification, Channel
+from app.models.push_subscription import PushSubscription
+from app.models.user import User
+from app.services.delivery_queue import delivery_queue
 from app.services.notification_service import send_web_push, send_email_notification
+from app.services.web_push import PushFeedback, close_web_push
 
+logger = logging.getLogger(__name__)
 
-def send_reminder(task_id: int) -> None:
-    """Send reminder for a task"""
+# Identifies this process as the holder of reminder leases
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Reminder not delivered yet for the task's current remind_at
+_unsent = or_(Task.reminder_sent_for.is_(None), Task.reminder_sent_for != Task.remind_at)
+
+# This process's pending reminders, keyed by reminder_job_id; 1s ticks over
+# 1024 slots cover the reminder window in one revolution
+reminder_timers = TimerWheel(tick=1.0, slots=1024)
+
+# Reminders fired but not yet sent, and batches being sent (awaited on
+# shutdown)
+_batch: list[int] = []
+_batch_handle: Optional[asyncio.TimerHandle] = None
+_in_flight: set[asyncio.Future] = set()
+_loader: Optional[asyncio.Task] = None
+
+
+class ReminderStats:
+    """Throughput counters for reminder batches sent by this process"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.sent = 0
+        self.skipped = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+
+    def record(self, size: int, sent: int, seconds: float) -> None:
+        with self._lock:
+            self.batches += 1
+            self.sent += sent
+            self.skipped += size - sent
+            self.largest_batch = max(self.largest_batch, size)
+            self.busy_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "sent": self.sent,
+                "skipped": self.skipped,
+                "largest_batch": self.largest_batch,
+                "reminders_per_second": self.sent / self.busy_seconds if self.busy_seconds else 0.0,
+            }
+
+
+reminder_stats = ReminderStats()
+
+
+def claim_reminder_batch(task_ids: list[int], owner: str) -> list[tuple[Task, User, list[PushSubscription]]]:
+    """
+    Claim a batch's reminders and load what delivering them needs
+    Only the lease holder may claim. Two round trips in one short session,
+    committed and closed before anything is delivered: the claim
+    (reminder_sent_for = remind_at) and one joined query for tasks, users and
+    push subscriptions (those that keep failing are skipped). A batch that
+    runs again, or one whose leases moved to another worker, gets nothing.
+    Claiming before delivering makes reminders at-most-once: if the process
+    dies between this commit and the deliveries, the claimed reminders are
+    not sent (never twice).
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        claim = (
+            update(Task)
+            .where(
+                Task.id.in_(task_ids),
+                Task.remind_at.isnot(None),
+                Task.status != Status.DONE,
+                Task.reminder_lease_owner == owner,
+                _unsent,
+            )
+            .values(
+                reminder_sent_for=Task.remind_at,
+                reminder_lease_owner=None,
+                reminder_lease_expires_at=None,
+            )
+            .returning(Task.id)
+            .execution_options(synchronize_session=False)
+        )
+        # Tasks deleted, done, reminder cleared, sent or leased elsewhere drop out
+        claimed = session.exec(claim).scalars().all()
+        if not claimed:
+            session.commit()
+            return []
+
+        recipients: dict[int, tuple[Task, User, list[PushSubscription]]] = {}
+        rows = session.exec(
+            select(Task, User, PushSubscription)
+            .join(User, User.id == Task.user_id)
+            .outerjoin(
+                PushSubscription,
+                and_(
+                    PushSubscription.user_id == Task.user_id,
+                    PushSubscription.failure_count < settings.PUSH_SUBSCRIPTION_MAX_FAILURES,
+                ),
+            )
+            .where(Task.id.in_(claimed))
+        )
+        for task, user, subscription in rows:
+            _, _, subscriptions = recipients.setdefault(task.id, (task, user, []))
+            if subscription is not None:
+                subscriptions.append(subscription)
+        session.commit()
+    return list(recipients.values())
+
+
+def record_reminders(notifications: list[Notification], feedback: PushFeedback) -> None:
+    """Insert a delivered batch's notifications and apply its push outcomes, in one transaction"""
     with Session(engine) as session:
-        # Get task
-        statement = select(Task).where(Task.id == task_id)
-        task = session.exec(statement).first()
+        feedback.apply(session)
+        # Each notification row is written once, with its delivery state
+        session.exec(
+            insert(Notification),
+            params=[notification.model_dump(exclude={"id"}) for notification in notifications],
+        )
+        session.commit()
 
-        if not task:
-            return  # Task doesn't exist
 
-        # Create notification record
-        notification = Notification(
+async def send_reminder_batch(task_ids: list[int], owner: str = WORKER_ID) -> int:
+    """
+    Send the reminders of a batch of tasks; returns how many were sent
+    Runs on the event loop. The database work runs on the executor in two
+    short sessions (claim_reminder_batch, record_reminders), and neither
+    holds a thread or connection while email and push go out through the
+    delivery queue; a slow SMTP server or push service only delays this
+    coroutine. Three round trips whatever the batch size; notifications are
+    inserted with their final delivery state (delivered_at set if any
+    channel got through), together with the push outcomes (dead
+    subscriptions deleted, failure counts).
+    """
+    started = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    recipients = await loop.run_in_executor(None, claim_reminder_batch, task_ids, owner)
+    if not recipients:
+        reminder_stats.record(len(task_ids), 0, time.perf_counter() - started)
+        return 0
+
+    feedback = PushFeedback()
+    notifications = [
+        Notification(
             user_id=task.user_id,
             task_id=task.id,
             channel=Channel.WEB_PUSH,  # We'll try web push first
@@ -32,18 +180,259 @@ def send_reminder(task_id: int) -> None:
                 "task_id": task.id,
             },
         )
-        session.add(notification)
+        for task, _, _ in recipients
+    ]
+    # The delivery queue runs them concurrently across the whole batch
+    delivered = await asyncio.gather(*(
+        _deliver_reminder(task, user, subscriptions, notification, feedback)
+        for (task, user, subscriptions), notification in zip(recipients, notifications)
+    ))
+    for notification, ok in zip(notifications, delivered):
+        if ok:
+            notification.delivered_at = datetime.now(timezone.utc)
+
+    await loop.run_in_executor(None, record_reminders, notifications, feedback)
+
+    elapsed = time.perf_counter() - started
+    reminder_stats.record(len(task_ids), len(notifications), elapsed)
+    logger.info("Sent %d of %d reminders in %.3fs", len(notifications), len(task_ids), elapsed)
+    return len(notifications)
+
+
+async def _deliver_reminder(
+    task: Task,
+    user: User,
+    subscriptions: list[PushSubscription],
+    notification: Notification,
+    feedback: PushFeedback,
+) -> bool:
+    """Email and web push (if subscription exists) at once; whether either got through"""
+    deliveries = [delivery_queue.deliver(Channel.EMAIL, send_email_notification, user, task)]
+    if subscriptions:
+        deliveries.append(
+            delivery_queue.deliver(Channel.WEB_PUSH, send_web_push, subscriptions, notification, feedback)
+        )
+    delivered = False
+    for result in await asyncio.gather(*deliveries, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.error("Notification delivery failed", exc_info=result)
+        else:
+            delivered = delivered or result
+    return delivered
+
+
+def reminder_job_id(task_id: int) -> str:
+    return f"reminder:{task_id}"
+
+
+def _window_end(now: datetime) -> datetime:
+    return now + timedelta(minutes=settings.REMINDER_WINDOW_MINUTES)
+
+
+def _in_window(task: Task, now: datetime) -> bool:
+    return (
+        task.remind_at is not None
+        and task.status != Status.DONE
+        and as_utc(task.remind_at) <= _window_end(now)
+    )
+
+
+def claim_statement(owner: str, now: datetime, limit: int):
+    """
+    UPDATE leasing up to `limit` unsent in-window reminders to `owner`
+    Candidates are free, expired or already ours (renewed). On Postgres the
+    candidate select is FOR UPDATE SKIP LOCKED, so concurrent claimers neither
+    block on nor double-claim a row; SQLite has no row locks and renders the
+    same statement as one atomic UPDATE ... RETURNING (writers are serialized).
+    """
+    # Matches the partial ix_tasks_pending_remind_at index
+    candidates = (
+        select(Task.id)
+        .where(
+            Task.remind_at.isnot(None),
+            Task.status != Status.DONE,
+            Task.remind_at > now - timedelta(hours=settings.REMINDER_CATCHUP_HOURS),
+            Task.remind_at <= _window_end(now),
+            _unsent,
+            or_(
+                Task.reminder_lease_owner.is_(None),
+                Task.reminder_lease_owner == owner,
+                Task.reminder_lease_expires_at < now,
+            ),
+        )
+        .order_by(Task.remind_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return (
+        update(Task)
+        .where(Task.id.in_(candidates))
+        .values(
+            reminder_lease_owner=owner,
+            reminder_lease_expires_at=now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS),
+        )
+        .returning(Task.id, Task.remind_at)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def claim_reminders(owner: str, now: datetime, limit: int) -> list[tuple[int, datetime]]:
+    """Lease (or renew) due reminders for `owner`; returns (task_id, remind_at) pairs"""
+    with Session(engine) as session:
+        claimed = session.exec(claim_statement(owner, now, limit)).all()
         session.commit()
-        session.refresh(notification)
+    return [(task_id, as_utc(remind_at)) for task_id, remind_at in claimed]
+
 
-        # Send web push if subscription exists
-        send_web_push(task.user_id, notification)
+def lease_for_write(task: Task) -> None:
+    """
+    Take the reminder lease inside a task write (call before commit)
+    The process handling the write schedules the job, so it becomes the
+    owner; a job elsewhere for the old lease or time then sends nothing.
+    Without a local scheduler the lease is released instead, for the
+    worker's next window load to claim.
+    """
+    now = datetime.now(timezone.utc)
+    if settings.RUN_SCHEDULER and _in_window(task, now):
+        task.reminder_lease_owner = WORKER_ID
+        task.reminder_lease_expires_at = now + timedelta(seconds=settings.REMINDER_LEASE_SECONDS)
+    else:
+        task.reminder_lease_owner = None
+        task.reminder_lease_expires_at = None
 
-        # Send email notification
-        send_email_notification(task.user_id, task, notification)
 
-        # Mark as delivered
-        notification.delivered_at = datetime.now(timezone.utc)
-        session.add(notification)
+def release_reminder_leases(owner: str = WORKER_ID) -> int:
+    """Hand back `owner`'s unsent reminders to other workers; returns how many"""
+    with Session(engine) as session:
+        released = session.exec(
+            update(Task)
+            .where(Task.reminder_lease_owner == owner)
+            .values(reminder_lease_owner=None, reminder_lease_expires_at=None)
+        ).rowcount
         session.commit()
+    return released
+
+
+def _delivered(future: asyncio.Future) -> None:
+    _in_flight.discard(future)
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Reminder delivery failed", exc_info=future.exception())
+
+
+def _flush_batch() -> None:
+    """Send the collected reminders as one batch"""
+    global _batch_handle
+    if _batch_handle is not None:
+        _batch_handle.cancel()
+        _batch_handle = None
+    if not _batch:
+        return
+
+    future = asyncio.get_running_loop().create_task(send_reminder_batch(_batch.copy()))
+    _batch.clear()
+    _in_flight.add(future)
+    future.add_done_callback(_delivered)
+
+
+def _fire_reminder(task_id: int) -> None:
+    """
+    Timer callback: add the reminder to the current batch
+    Reminders cluster on round times, so those firing within
+    REMINDER_BATCH_WINDOW_SECONDS of each other are sent together, with
+    one claim and one insert for the lot.
+    """
+    global _batch_handle
+    _batch.append(task_id)
+    if len(_batch) >= settings.REMINDER_BATCH_SIZE:
+        _flush_batch()
+    elif _batch_handle is None:
+        _batch_handle = asyncio.get_running_loop().call_later(
+            settings.REMINDER_BATCH_WINDOW_SECONDS, _flush_batch
+        )
+
+
+def _add_reminder_job(task_id: int, remind_at: datetime) -> None:
+    reminder_timers.schedule(
+        reminder_job_id(task_id), remind_at.timestamp(), _fire_reminder, task_id
+    )
+
+
+def cancel_reminder(task_id: int) -> None:
+    reminder_timers.cancel(reminder_job_id(task_id))
+
+
+def schedule_reminder(task: Task) -> None:
+    """
+    Bring a task's reminder timer in line with the task after a write
+    Only reminders inside the current window get a timer (leased by
+    lease_for_write); one edited out of the window (or onto a done task)
+    loses its timer, and later ones are left to load_reminder_window.
+    API processes without a scheduler leave all of it to the worker.
+    """
+    if not settings.RUN_SCHEDULER:
+        return
+    if _in_window(task, datetime.now(timezone.utc)):
+        _add_reminder_job(task.id, as_utc(task.remind_at))
+    else:
+        cancel_reminder(task.id)
+
+
+async def load_reminder_window() -> int:
+    """
+    Lease and schedule unsent reminders due before the end of the window
+    Runs every REMINDER_LOADER_INTERVAL_SECONDS, so timers in memory are
+    bounded by near-term volume; the tasks table stays the durable record.
+    With several workers each reminder is leased to one of them, and a dead
+    worker's reminders are taken over when its leases expire. Reminders
+    missed while nothing was running are picked up back to
+    REMINDER_CATCHUP_HOURS. Returns the timers added or moved.
+    """
+    claimed = await asyncio.get_running_loop().run_in_executor(
+        None, claim_reminders, WORKER_ID, datetime.now(timezone.utc), settings.REMINDER_CLAIM_BATCH
+    )
+
+    scheduled = 0
+    for task_id, remind_at in claimed:
+        if reminder_timers.deadline(reminder_job_id(task_id)) != remind_at.timestamp():
+            _add_reminder_job(task_id, remind_at)
+            scheduled += 1
+    return scheduled
+
+
+async def _run_window_loader() -> None:
+    while True:
+        try:
+            await load_reminder_window()
+        except Exception:
+            logger.exception("Loading the reminder window failed")
+        await asyncio.sleep(settings.REMINDER_LOADER_INTERVAL_SECONDS)
+
+
+def start_reminders() -> None:
+    """Start the reminder timers and the window loader (first run right away) on this loop"""
+    global _loader
+    delivery_queue.start()
+    reminder_timers.start()
+    if _loader is None:
+        _loader = asyncio.get_running_loop().create_task(_run_window_loader())
+
 
+async def stop_reminders() -> None:
+    """
+    Stop loading and firing reminders, then drain
+    Reminders already fired are sent and running deliveries finish; those
+    still leased to this process are released so another worker loads them
+    right away.
+    """
+    global _loader
+    if _loader is not None:
+        _loader.cancel()
+        _loader = None
+    reminder_timers.stop()
+    _flush_batch()
+    await asyncio.gather(*_in_flight, return_exceptions=True)
+    await delivery_queue.stop()
+    await close_web_push()
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, close_smtp_pool)
+    await loop.run_in_executor(None, release_reminder_leases, WORKER_ID)
@@ -0,0 +1,44 @@
+"""Periodic sweep of push subscriptions that keep failing"""
+
+import logging
+
+from apscheduler.schedulers.base import BaseScheduler
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.db import engine
+from app.models.push_subscription import PushSubscription
+
+logger = logging.getLogger(__name__)
+
+SWEEP_JOB_ID = "push-subscriptions:sweep"
+
+
+def sweep_push_subscriptions() -> int:
+    """
+    Delete subscriptions with PUSH_SUBSCRIPTION_MAX_FAILURES failures in a row
+    Reminder batches already skip them; ones reported gone (404/410) are
+    deleted as soon as a push sees it. Returns how many were deleted.
+    """
+    with Session(engine) as session:
+        result = session.exec(
+            delete(PushSubscription).where(
+                PushSubscription.failure_count >= settings.PUSH_SUBSCRIPTION_MAX_FAILURES
+            )
+        )
+        session.commit()
+    if result.rowcount:
+        logger.info("Swept %d failing push subscriptions", result.rowcount)
+    return result.rowcount
+
+
+def schedule_subscription_sweep(scheduler: BaseScheduler) -> None:
+    """Run the sweep every PUSH_SUBSCRIPTION_SWEEP_MINUTES (one persisted job)"""
+    scheduler.add_job(
+        sweep_push_subscriptions,
+        "interval",
+        minutes=settings.PUSH_SUBSCRIPTION_SWEEP_MINUTES,
+        id=SWEEP_JOB_ID,
+        replace_existing=True,
+    )
@@ -5,7 +5,8 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.scheduler import scheduler
-from app.db import init_db
+from app.core.security import password_hasher
+from app.db import async_engine, init_db
 
 app = FastAPI(
     title="Smart AI Task Organizer API",
@@ -20,6 +21,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -27,16 +29,37 @@ app.add_middleware(
 async def startup_event() -> None:
     """Initialize database and scheduler on startup"""
     await init_db()
-    scheduler.start()
-    # Rebuild reminder jobs from existing tasks
-    from app.services.task_service import rebuild_reminder_jobs
-    await rebuild_reminder_jobs()
+    # With a separate worker (python -m app.worker) the API only serves requests
+    if settings.RUN_SCHEDULER:
+        scheduler.start()
+        from app.jobs.subscription_job import schedule_subscription_sweep
+        schedule_subscription_sweep(scheduler)
+        # Reminders are loaded window by window from the tasks table, starting now
+        # (including any missed while down), so startup cost doesn't grow with backlog
+        from app.jobs.reminder_job import start_reminders
+        start_reminders()
+
+    # Compile the urgency lexicon before the first request needs it
+    from app.services.urgency import urgency_lexicon
+    urgency_lexicon()
+
+    # Import the ML stack off the event loop once the worker is serving,
+    # instead of at import time or inside the first /ai request
+    if settings.ML_WARMUP_ON_STARTUP:
+        from app.services.ai_service import start_loading_ml_backend
+        start_loading_ml_backend()
 
 
 @app.on_event("shutdown")
 async def shutdown_event() -> None:
-    """Shutdown scheduler on app close"""
-    scheduler.shutdown()
+    """Shutdown scheduler and worker pools on app close"""
+    if settings.RUN_SCHEDULER:
+        from app.jobs.reminder_job import stop_reminders
+        await stop_reminders()
+    if scheduler.running:
+        scheduler.shutdown()
+    password_hasher.shutdown()
+    await async_engine.dispose()
 
 
 @app.get("/health")
@@ -4,6 +4,15 @@ from app.models.user import User
 from app.models.task import Task
 from app.models.notification import Notification
 from app.models.push_subscription import PushSubscription
+from app.models.user_daily_stats import UserDailyStats
+from app.models.user_feature_profile import UserFeatureProfile
 
-__all__ = ["User", "Task", "Notification", "PushSubscription"]
+__all__ = [
+    "User",
+    "Task",
+    "Notification",
+    "PushSubscription",
+    "UserDailyStats",
+    "UserFeatureProfile",
+]
 
@@ -4,6 +4,7 @@ from datetime import datetime, timezone
 from typing import Optional
 from enum import Enum
 
+from sqlalchemy import DateTime
 from sqlmodel import SQLModel, Field, Relationship, Column, String, JSON
 
 
@@ -23,8 +24,8 @@ class Notification(SQLModel, table=True):
     user_id: int = Field(foreign_key="users.id", index=True)
     task_id: Optional[int] = Field(default=None, foreign_key="tasks.id")
     channel: Channel = Field(index=True)
-    scheduled_for: datetime = Field(index=True)
-    delivered_at: Optional[datetime] = Field(default=None)
+    scheduled_for: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    delivered_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
     payload_json: Optional[dict] = Field(default=None, sa_column=Column(JSON))
 
     # Relationships
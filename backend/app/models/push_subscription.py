@@ -3,6 +3,7 @@
 from datetime import datetime, timezone
 from typing import Optional
 
+from sqlalchemy import DateTime
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -16,7 +17,11 @@ class PushSubscription(SQLModel, table=True):
     endpoint: str = Field(max_length=500)
     p256dh: str = Field(max_length=200)
     auth: str = Field(max_length=100)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Failed deliveries since the last successful one
+    failure_count: int = Field(default=0)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
 
     # Relationships
     user: "User" = Relationship(back_populates="push_subscriptions")
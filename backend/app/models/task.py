@@ -4,7 +4,8 @@ from datetime import datetime, timezone
 from typing import Optional
 from enum import Enum
 
-from sqlmodel import SQLModel, Field, Relationship, Column, String
+from sqlalchemy import DateTime, text
+from sqlmodel import SQLModel, Field, Relationship, Column, String, Index
 
 
 class Priority(str, Enum):
@@ -27,17 +28,44 @@ class Task(SQLModel, table=True):
     """Task model"""
 
     __tablename__ = "tasks"
+    # Indexes mirror the query shapes (see alembic/versions/0002_task_query_indexes.py):
+    # every read filters by user_id first, then orders by created_at or
+    # filters by status/due_at; the reminder scan only looks at open reminders.
+    __table_args__ = (
+        # GET /tasks listing and keyset pagination, analytics per-day counts
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Analytics completed/overdue/upcoming counts
+        Index("ix_tasks_user_id_status_due_at", "user_id", "status", "due_at"),
+        # Reminder rebuild: pending reminders on not-done tasks only
+        Index(
+            "ix_tasks_pending_remind_at",
+            "remind_at",
+            postgresql_where=text("remind_at IS NOT NULL AND status != 'DONE'"),
+            sqlite_where=text("remind_at IS NOT NULL AND status != 'DONE'"),
+        ),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="users.id", index=True)
+    user_id: int = Field(foreign_key="users.id")
     title: str = Field(max_length=255)
     description: Optional[str] = Field(default=None, max_length=2000)
     priority: Priority = Field(default=Priority.MEDIUM)
-    due_at: Optional[datetime] = Field(default=None, index=True)
-    remind_at: Optional[datetime] = Field(default=None, index=True)
-    status: Status = Field(default=Status.TODO, index=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    due_at: Optional[datetime] = Field(default=None, index=True, sa_type=DateTime(timezone=True))
+    remind_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    # remind_at value whose reminder was delivered; differs again once remind_at moves
+    reminder_sent_for: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    # Scheduler process that holds the pending reminder, and until when
+    reminder_lease_owner: Optional[str] = Field(default=None, max_length=255)
+    reminder_lease_expires_at: Optional[datetime] = Field(
+        default=None, sa_type=DateTime(timezone=True)
+    )
+    status: Status = Field(default=Status.TODO)
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
 
     # Relationships
     user: "User" = Relationship(back_populates="tasks")
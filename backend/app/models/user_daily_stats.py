@@ -0,0 +1,22 @@
+"""Per-user daily task statistics rollup"""
+
+from datetime import date
+
+from sqlmodel import SQLModel, Field
+
+
+class UserDailyStats(SQLModel, table=True):
+    """
+    Incrementally maintained task counts per user per UTC day
+    Each existing task contributes to:
+    - created_count / completed_count on the day it was created
+    - open_due_count on the day it is due, while it is not done
+    """
+
+    __tablename__ = "user_daily_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    day: date = Field(primary_key=True)
+    created_count: int = Field(default=0)
+    completed_count: int = Field(default=0)
+    open_due_count: int = Field(default=0)
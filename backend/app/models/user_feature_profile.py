@@ -0,0 +1,35 @@
+"""Per-user feature profile for AI suggestions"""
+
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlmodel import SQLModel, Field, Column, JSON
+
+HOURS_PER_DAY = 24
+
+
+class UserFeatureProfile(SQLModel, table=True):
+    """
+    Incrementally maintained summary of a user's task history
+    Holds exactly what the suggestion heuristics need, so /ai/suggest reads
+    one row instead of every task the user ever created.
+    """
+
+    __tablename__ = "user_feature_profiles"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    total_tasks: int = Field(default=0)
+    low_count: int = Field(default=0)
+    medium_count: int = Field(default=0)
+    high_count: int = Field(default=0)
+    # Done tasks with a due date, bucketed by due_at hour (UTC)
+    completion_hours: list[int] = Field(
+        default_factory=lambda: [0] * HOURS_PER_DAY, sa_column=Column(JSON, nullable=False)
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
+
+    @property
+    def completed_with_due_count(self) -> int:
+        return sum(self.completion_hours)
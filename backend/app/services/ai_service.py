@@ -1,150 +1,344 @@
 """AI service for task suggestions"""
 
+import asyncio
+import importlib.util
+import threading
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from sqlmodel import Session, select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.db import engine
-from app.models.task import Task, Priority, Status
-from app.schemas.task import TaskCreate
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.task import Priority
+from app.models.user_feature_profile import HOURS_PER_DAY, UserFeatureProfile
+from app.services.free_slots import BusyIntervals, load_busy_intervals
+from app.services.profile_service import get_feature_profile
+from app.services.urgency import urgency_lexicon
 
-# Optional ML imports (gracefully handle if not available)
-try:
-    import numpy as np
-    from sklearn.linear_model import LogisticRegression
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+# Optional ML stack (numpy, scikit-learn). Importing it costs about a second,
+# so it is only located here and imported by load_ml_backend() on first use
+ML_AVAILABLE = all(importlib.util.find_spec(name) is not None for name in ("numpy", "sklearn"))
+priority_model = None
+_ml_lock = threading.Lock()
+_ml_loading = None
+
+
+def load_ml_backend() -> bool:
+    """Import the ML stack once (thread-safe); returns whether it is usable"""
+    global ML_AVAILABLE, priority_model
+    if not ML_AVAILABLE or priority_model is not None:
+        return ML_AVAILABLE
+
+    with _ml_lock:
+        if priority_model is None:
+            try:
+                from app.services import priority_model as model_module
+            except ImportError:
+                ML_AVAILABLE = False
+                return False
+            priority_model = model_module
+    return True
+
+
+def start_loading_ml_backend() -> None:
+    """Run load_ml_backend() once on the running loop's executor"""
+    global _ml_loading
+    if _ml_loading is None and ML_AVAILABLE and priority_model is None:
+        _ml_loading = asyncio.get_running_loop().run_in_executor(None, load_ml_backend)
+
+
+def ml_backend_ready() -> bool:
+    """
+    Whether the ML stack is loaded, without ever waiting for it
+    On the event loop a missing stack starts loading in the background and
+    this returns False, so requests use the heuristics meanwhile; without a
+    running loop (scripts, tests) it is loaded right here.
+    """
+    if priority_model is not None or not ML_AVAILABLE:
+        return priority_model is not None
+    try:
+        start_loading_ml_backend()
+    except RuntimeError:  # No running event loop to block
+        return load_ml_backend()
+    return False
+
+
+def ml_status() -> dict:
+    """Whether the ML stack is installed and loaded, with model cache counters"""
+    loaded = priority_model is not None
+    return {
+        "ml_available": ML_AVAILABLE,
+        "ml_loaded": loaded,
+        "model_cache": priority_model.model_cache_stats() if loaded else None,
+    }
+
+# Suggested slots are picked from the next 72 hourly slots
+SLOT_HORIZON_HOURS = 72
+
+# Slot length when the draft has no estimated duration
+DEFAULT_SLOT_MINUTES = 60
+
+# completion_hours histogram -> confidence of each hour of the day
+hour_confidence_cache = TTLCache(
+    maxsize=settings.SLOT_CACHE_SIZE, ttl=settings.SLOT_CACHE_TTL_SECONDS
+)
+
+PRIORITY_REASONS = {
+    "urgent_or_history": "High priority due to urgency keywords or user's preference for high-priority tasks",
+    "history_low": "Low priority based on user's historical task distribution",
+    "history_medium": "Medium priority based on user's historical patterns",
+    "urgent_new_user": "High priority due to urgency keywords",
+    "new_user": "Default medium priority for new users",
+    "model": "Predicted by a model trained on task history",
+}
+
+
+def _context_dict(task_context: Optional[any]) -> Optional[dict]:
+    """Convert task_context to dict if it's a Pydantic model"""
+    if task_context:
+        if hasattr(task_context, "model_dump"):
+            return task_context.model_dump()
+        elif isinstance(task_context, dict):
+            return task_context
+    return None
 
 
 async def get_ai_suggestions(
-    user_id: int, task_context: Optional[any] = None
+    session: AsyncSession, user_id: int, task_context: Optional[any] = None
 ) -> dict:
     """
     Get AI suggestions for task priority and optimal time slots
-    Uses heuristic approach with optional ML fallback
+    Uses the trained priority model when one is available, else heuristics
     """
-    with Session(engine) as session:
-        # Get user's task history
-        statement = select(Task).where(Task.user_id == user_id)
-        all_tasks = session.exec(statement).all()
-
-        # Convert task_context to dict if it's a Pydantic model
-        context_dict = None
-        if task_context:
-            if hasattr(task_context, "model_dump"):
-                context_dict = task_context.model_dump()
-            elif isinstance(task_context, dict):
-                context_dict = task_context
-
-        # Calculate suggested priority using heuristic
-        priority, priority_reason = _suggest_priority(context_dict, all_tasks)
-
-        # Calculate suggested time slots
-        time_slots, reasoning = _suggest_time_slots(user_id, all_tasks, context_dict)
-
-        return {
+    # Get user's task history summary (one row, whatever the history size)
+    profile = await get_feature_profile(session, user_id)
+
+    context_dict = _context_dict(task_context)
+
+    # Calculate suggested priority with the model, else the heuristic
+    predicted = await _model_priorities([context_dict], profile)
+    priority, priority_reason = _suggest_priority(context_dict, profile, predicted)
+
+    # Calculate suggested time slots around the user's upcoming tasks
+    now = datetime.now(timezone.utc)
+    busy = await _load_busy(session, user_id, now, [_slot_duration(context_dict)])
+    time_slots, reasoning = _suggest_time_slots(user_id, profile, context_dict, busy, now)
+
+    return {
+        "priority": priority,
+        "priority_reason": priority_reason,
+        "time_slots": time_slots,
+        "reasoning": reasoning,
+    }
+
+
+async def get_ai_suggestions_batch(
+    session: AsyncSession, user_id: int, task_contexts: list
+) -> list[dict]:
+    """
+    Get AI suggestions for many draft tasks at once
+    Loads the user's profile and busy periods once, scores all priorities
+    with one model call (when a model is available) and shares time slots
+    between drafts. Results match calling get_ai_suggestions for each context.
+    """
+    profile = await get_feature_profile(session, user_id)
+    context_dicts = [_context_dict(context) for context in task_contexts]
+
+    predicted = await _model_priorities(context_dicts, profile)
+    priorities = _suggest_priorities(context_dicts, profile, predicted)
+
+    # Slots depend only on the profile, busy periods and duration, so drafts
+    # with the same estimated duration share them
+    now = datetime.now(timezone.utc)
+    durations = [_slot_duration(context) for context in context_dicts]
+    busy = await _load_busy(session, user_id, now, durations)
+    slots_by_duration = {}
+    for context, duration in zip(context_dicts, durations):
+        if duration not in slots_by_duration:
+            slots_by_duration[duration] = _suggest_time_slots(user_id, profile, context, busy, now)
+
+    suggestions = []
+    for (priority, priority_reason), duration in zip(priorities, durations):
+        time_slots, reasoning = slots_by_duration[duration]
+        suggestions.append({
             "priority": priority,
             "priority_reason": priority_reason,
-            "time_slots": time_slots,
+            "time_slots": [dict(slot) for slot in time_slots],
             "reasoning": reasoning,
-        }
+        })
+    return suggestions
+
+
+async def _load_busy(
+    session: AsyncSession, user_id: int, now: datetime, durations: list[timedelta]
+) -> BusyIntervals:
+    """Busy intervals covering every slot the suggestions could pick"""
+    earliest = now.replace(minute=0, second=0, microsecond=0)
+    longest = max(durations, default=timedelta(minutes=DEFAULT_SLOT_MINUTES))
+    horizon = now + timedelta(hours=SLOT_HORIZON_HOURS) + longest
+    return await load_busy_intervals(session, user_id, earliest, horizon)
 
 
-def _suggest_priority(task_context: Optional[dict], all_tasks: list[Task]) -> tuple[str, str]:
-    """Suggest priority using heuristic"""
-    if not task_context:
-        return Priority.MEDIUM.value, "Default medium priority"
+def _context_text(task_context: dict) -> str:
+    return f"{task_context.get('title') or ''} {task_context.get('description') or ''}"
 
-    # Simple heuristic: check for urgency keywords
-    title = (task_context.get("title") or "").lower()
-    description = (task_context.get("description") or "").lower()
-    text = f"{title} {description}"
 
-    urgency_keywords = ["urgent", "asap", "important", "critical", "deadline"]
-    has_urgency = any(keyword in text for keyword in urgency_keywords)
+def _high_ratio(profile: UserFeatureProfile) -> float:
+    return profile.high_count / profile.total_tasks if profile.total_tasks else 0.0
+
+
+async def _model_priorities(
+    task_contexts: list[Optional[dict]], profile: UserFeatureProfile
+) -> Optional[list[Priority]]:
+    """One model prediction per context (a single call), or None to use the heuristic"""
+    if not any(task_contexts) or not ml_backend_ready():
+        return None
+    texts = [_context_text(context) if context else "" for context in task_contexts]
+    return await priority_model.predict_priorities(profile.user_id, texts)
+
+
+def _suggest_priority(
+    task_context: Optional[dict],
+    profile: UserFeatureProfile,
+    predicted: Optional[list[Priority]] = None,
+) -> tuple[str, str]:
+    """Suggest priority from the model's prediction, falling back to the heuristic"""
+    return _suggest_priorities([task_context], profile, predicted)[0]
+
+
+def _suggest_priorities(
+    task_contexts: list[Optional[dict]],
+    profile: UserFeatureProfile,
+    predicted: Optional[list[Priority]] = None,
+) -> list[tuple[str, str]]:
+    """
+    _suggest_priority over a batch of contexts
+    `predicted` comes from _model_priorities; without it each context goes
+    through the urgency lexicon and the user's history. The lexicon is one
+    compiled-regex pass per text, which scales with the text rather than
+    the batch, so the heuristic stays a per-context loop instead of NumPy.
+    """
+    suggestions = []
+    for index, context in enumerate(task_contexts):
+        if not context:
+            suggestions.append((Priority.MEDIUM.value, "Default medium priority"))
+        elif predicted is not None:
+            suggestions.append((predicted[index].value, PRIORITY_REASONS["model"]))
+        else:
+            suggestions.append(_heuristic_priority(_context_text(context), profile))
+    return suggestions
+
+
+def _heuristic_priority(text: str, profile: UserFeatureProfile) -> tuple[str, str]:
+    """Priority from urgency terms in the text and the user's priority mix"""
+    # Simple heuristic: check for urgency terms
+    has_urgency = urgency_lexicon().is_urgent(text)
 
     # Check user's historical priority distribution
-    if all_tasks:
-        high_count = sum(1 for t in all_tasks if t.priority == Priority.HIGH)
-        total = len(all_tasks)
-        high_ratio = high_count / total if total > 0 else 0
+    if profile.total_tasks:
+        high_ratio = _high_ratio(profile)
 
         if has_urgency or high_ratio > 0.3:
-            return Priority.HIGH.value, "High priority due to urgency keywords or user's preference for high-priority tasks"
+            return Priority.HIGH.value, PRIORITY_REASONS["urgent_or_history"]
         elif high_ratio < 0.1:
-            return Priority.LOW.value, "Low priority based on user's historical task distribution"
+            return Priority.LOW.value, PRIORITY_REASONS["history_low"]
         else:
-            return Priority.MEDIUM.value, "Medium priority based on user's historical patterns"
+            return Priority.MEDIUM.value, PRIORITY_REASONS["history_medium"]
     else:
         if has_urgency:
-            return Priority.HIGH.value, "High priority due to urgency keywords"
-        return Priority.MEDIUM.value, "Default medium priority for new users"
+            return Priority.HIGH.value, PRIORITY_REASONS["urgent_new_user"]
+        return Priority.MEDIUM.value, PRIORITY_REASONS["new_user"]
+
+
+def _preferred_hours(profile: UserFeatureProfile) -> list[int]:
+    """Top 2 completion hours"""
+    hour_counts = {hour: count for hour, count in enumerate(profile.completion_hours) if count}
+    sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
+    return [h[0] for h in sorted_hours[:2]] if sorted_hours else [14, 10]  # Default: 2pm, 10am
+
+
+def _hour_confidences(profile: UserFeatureProfile) -> list[float]:
+    """
+    Confidence of each hour of the day (UTC) for the profile's completion hours
+    Non-preferred hours score 0; preferred hours score their completion share.
+    Computed once per distinct completion histogram, so it is rebuilt only
+    when a task write changes the user's profile.
+    """
+    key = tuple(profile.completion_hours)
+    confidences = hour_confidence_cache.get(key)
+    if confidences is None:
+        completed_count = profile.completed_with_due_count
+        preferred_hours = _preferred_hours(profile)
+        confidences = [
+            min(count / completed_count, 0.9) if hour in preferred_hours else 0.0
+            for hour, count in enumerate(profile.completion_hours)
+        ]
+        hour_confidence_cache.set(key, confidences)
+    return confidences
+
+
+def _slot_confidences(profile: UserFeatureProfile, start: datetime) -> list[float]:
+    """Confidence of each of the next 72 hourly slots from `start`"""
+    confidences = _hour_confidences(profile)
+    rotated = confidences[start.hour:] + confidences[: start.hour]
+    return (rotated * (SLOT_HORIZON_HOURS // HOURS_PER_DAY + 1))[:SLOT_HORIZON_HOURS]
+
+
+def _slot_duration(task_context: Optional[dict]) -> timedelta:
+    minutes = (task_context or {}).get("estimated_duration_minutes") or DEFAULT_SLOT_MINUTES
+    return timedelta(minutes=minutes)
+
+
+def _slot(start: datetime, duration: timedelta, confidence: float) -> dict:
+    return {
+        "start": start.isoformat(),
+        "end": (start + duration).isoformat(),
+        "confidence": confidence,
+    }
 
 
 def _suggest_time_slots(
-    user_id: int, all_tasks: list[Task], task_context: Optional[dict] = None
+    user_id: int,
+    profile: UserFeatureProfile,
+    task_context: Optional[dict] = None,
+    busy: Optional[BusyIntervals] = None,
+    now: Optional[datetime] = None,
 ) -> tuple[list[dict], str]:
-    """Suggest optimal time slots using user's historical completion patterns"""
-    now = datetime.now(timezone.utc)
-    next_72h = now + timedelta(hours=72)
+    """
+    Suggest optimal time slots using user's historical completion patterns
+    Slots last the task's estimated duration and never overlap `busy`.
+    """
+    now = now or datetime.now(timezone.utc)
+    duration = _slot_duration(task_context)
+    busy = busy or BusyIntervals(())
 
     # Analyze user's completion patterns
-    completed_tasks = [t for t in all_tasks if t.status == Status.DONE and t.due_at]
-
-    if not completed_tasks:
+    if not profile.completed_with_due_count:
         # Default suggestions for new users
-        slot1 = now + timedelta(hours=2)
-        slot2 = now + timedelta(hours=24)
-        return [
-            {
-                "start": slot1.isoformat(),
-                "end": (slot1 + timedelta(hours=1)).isoformat(),
-                "confidence": 0.5,
-            },
-            {
-                "start": slot2.isoformat(),
-                "end": (slot2 + timedelta(hours=1)).isoformat(),
-                "confidence": 0.5,
-            },
-        ], "Default time slots for new users"
-
-    # Build histogram of completion times by hour
-    hour_counts = {}
-    for task in completed_tasks:
-        if task.due_at:
-            hour = task.due_at.hour
-            hour_counts[hour] = hour_counts.get(hour, 0) + 1
-
-    # Find top 2 preferred hours
-    sorted_hours = sorted(hour_counts.items(), key=lambda x: x[1], reverse=True)
-    preferred_hours = [h[0] for h in sorted_hours[:2]] if sorted_hours else [14, 10]  # Default: 2pm, 10am
+        slot1 = busy.next_free(now + timedelta(hours=2), duration)
+        slot2 = busy.next_free(max(now + timedelta(hours=24), slot1 + duration), duration)
+        return [_slot(slot1, duration, 0.5), _slot(slot2, duration, 0.5)], "Default time slots for new users"
+
+    preferred_hours = _preferred_hours(profile)
 
-    # Generate time slots in next 72h
+    # Earliest conflict-free preferred slots in the next 72h
+    start = now.replace(minute=0, second=0, microsecond=0)
     time_slots = []
-    current = now.replace(minute=0, second=0, microsecond=0)
-
-    while current < next_72h and len(time_slots) < 2:
-        if current.hour in preferred_hours:
-            confidence = hour_counts.get(current.hour, 0) / len(completed_tasks) if completed_tasks else 0.5
-            time_slots.append({
-                "start": current.isoformat(),
-                "end": (current + timedelta(hours=1)).isoformat(),
-                "confidence": min(confidence, 0.9),
-            })
-        current += timedelta(hours=1)
+    for offset, confidence in enumerate(_slot_confidences(profile, start)):
+        slot = start + timedelta(hours=offset)
+        if confidence > 0 and not busy.overlaps(slot, slot + duration):
+            time_slots.append(_slot(slot, duration, confidence))
+            if len(time_slots) == 2:
+                break
 
     # If we don't have enough slots, add defaults
     if len(time_slots) < 2:
-        slot = now + timedelta(hours=2)
-        time_slots.append({
-            "start": slot.isoformat(),
-            "end": (slot + timedelta(hours=1)).isoformat(),
-            "confidence": 0.5,
-        })
+        slot = busy.next_free(now + timedelta(hours=2), duration)
+        time_slots.append(_slot(slot, duration, 0.5))
 
     reasoning = f"Based on user's historical completion patterns, preferred hours are {preferred_hours}"
+    if busy:
+        reasoning += f", avoiding {len(busy)} busy periods"
 
     return time_slots[:2], reasoning
-
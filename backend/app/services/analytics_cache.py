@@ -0,0 +1,72 @@
+"""Versioned response cache for the analytics summary"""
+
+from datetime import datetime, time, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.dates import as_utc
+from app.models.user import User
+
+# Deadlines this far ahead are listed as upcoming
+UPCOMING_WINDOW = timedelta(days=7)
+
+# (user_id, user_data_version) -> summary dict
+analytics_cache = TTLCache(
+    maxsize=settings.ANALYTICS_CACHE_SIZE, ttl=settings.ANALYTICS_CACHE_TTL_SECONDS
+)
+
+
+async def user_data_version(session: AsyncSession, user_id: int) -> int:
+    """
+    Current data version of a user, read from the database
+    Versions live in users.data_version, so a write through any API worker
+    makes every worker's cached summary for that user unreachable.
+    """
+    version = (await session.exec(select(User.data_version).where(User.id == user_id))).first()
+    return version or 0
+
+
+async def bump_user_data_version(session: AsyncSession, user_id: Optional[int] = None) -> None:
+    """
+    Mark cached analytics stale, in the caller's transaction
+    Bumps one user, or everyone when user_id is None.
+    """
+    statement = update(User).values(data_version=User.data_version + 1)
+    if user_id is not None:
+        statement = statement.where(User.id == user_id)
+    await session.exec(statement)
+
+
+def get_cached_summary(user_id: int, version: int) -> Optional[dict]:
+    """Cached summary for this exact data version, if still fresh"""
+    return analytics_cache.get((user_id, version))
+
+
+def cache_summary(
+    user_id: int,
+    version: int,
+    summary: dict,
+    now: datetime,
+    enters_window_at: Optional[datetime] = None,
+) -> None:
+    """
+    Cache a summary computed at `now` from data at `version`
+    Entries expire early when a time-dependent field would change: when the
+    next upcoming deadline passes (it turns overdue), when the next deadline
+    beyond the upcoming window (`enters_window_at`) moves into it, or when
+    the UTC day rolls over (the per-day window and today's overdue slice
+    shift).
+    """
+    expires_at = datetime.combine(now.date() + timedelta(days=1), time.min, tzinfo=timezone.utc)
+    upcoming = summary["upcoming_deadlines"]
+    if upcoming and upcoming[0]["due_at"]:
+        expires_at = min(expires_at, as_utc(datetime.fromisoformat(upcoming[0]["due_at"])))
+    if enters_window_at is not None:
+        expires_at = min(expires_at, as_utc(enters_window_at) - UPCOMING_WINDOW)
+
+    analytics_cache.set((user_id, version), summary, ttl=(expires_at - now).total_seconds())
@@ -0,0 +1,92 @@
+"""Asyncio delivery queue for notifications, with per-channel concurrency limits"""
+
+import asyncio
+import concurrent.futures
+from typing import Any, Awaitable, Callable, Optional
+
+from app.core.config import settings
+from app.models.notification import Channel
+
+Deliver = Callable[..., Awaitable[bool]]
+
+
+class DeliveryQueue:
+    """
+    Bounded per-channel queues, each drained by a fixed set of consumers
+    At most `limits[channel]` deliveries of a channel run at once. When a
+    channel's buffer of `maxsize` is full producers wait (`put` suspends),
+    so a reminder burst slows the batches feeding it instead of piling up
+    in memory.
+    """
+
+    def __init__(self, limits: dict[Channel, int], maxsize: int):
+        self.limits = limits
+        self.maxsize = maxsize
+        self._queues: dict[Channel, asyncio.Queue] = {}
+        self._consumers: list[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def start(self) -> None:
+        """Start the consumers on the running event loop"""
+        if self.running:
+            return
+        loop = asyncio.get_running_loop()
+        self._queues = {channel: asyncio.Queue(self.maxsize) for channel in self.limits}
+        self._consumers = [
+            loop.create_task(self._consume(queue))
+            for channel, queue in self._queues.items()
+            for _ in range(self.limits[channel])
+        ]
+        self._loop = loop
+
+    async def stop(self) -> None:
+        """Finish every queued delivery, then stop the consumers"""
+        if not self.running:
+            return
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+        for consumer in self._consumers:
+            consumer.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = []
+        self._loop = None
+
+    async def put(self, channel: Channel, deliver: Deliver, *args: Any) -> concurrent.futures.Future:
+        """Queue a delivery, waiting while the channel's buffer is full"""
+        result: concurrent.futures.Future = concurrent.futures.Future()
+        await self._queues[channel].put((deliver, args, result))
+        return result
+
+    async def deliver(self, channel: Channel, deliver: Deliver, *args: Any) -> bool:
+        """
+        Queue a delivery and wait for its result
+        Without a running queue (scripts, tests) the delivery runs right away
+        on the caller's loop.
+        """
+        if not self.running:
+            return await deliver(*args)
+        return await asyncio.wrap_future(await self.put(channel, deliver, *args))
+
+    async def _consume(self, queue: asyncio.Queue) -> None:
+        while True:
+            deliver, args, result = await queue.get()
+            try:
+                if result.set_running_or_notify_cancel():
+                    try:
+                        result.set_result(await deliver(*args))
+                    except Exception as exc:
+                        result.set_exception(exc)
+            finally:
+                queue.task_done()
+
+
+delivery_queue = DeliveryQueue(
+    limits={
+        Channel.WEB_PUSH: settings.PUSH_CONCURRENCY,
+        Channel.EMAIL: settings.EMAIL_CONCURRENCY,
+    },
+    maxsize=settings.DELIVERY_QUEUE_SIZE,
+)
@@ -0,0 +1,66 @@
+"""Busy-interval index used to keep suggested time slots clear of existing tasks"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.dates import as_utc
+from app.models.task import Task, Status
+
+# Tasks have no duration of their own: an open task is assumed to take the
+# hour before it is due
+TASK_BLOCK = timedelta(hours=1)
+
+
+class BusyIntervals:
+    """
+    Sorted, merged busy intervals with O(log n) conflict checks
+    Building sorts once (O(n log n)); overlapping or touching intervals are
+    merged so queries only need a bisect on interval ends.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime]]) -> None:
+        merged: list[list[datetime]] = []
+        for start, end in sorted(intervals):
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _first_ending_after(self, moment: datetime) -> int:
+        return bisect_right(self.ends, moment)
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Whether [start, end) intersects any busy interval"""
+        index = self._first_ending_after(start)
+        return index < len(self.starts) and self.starts[index] < end
+
+    def next_free(self, start: datetime, duration: timedelta) -> datetime:
+        """Earliest start >= `start` for which [start, start + duration) is free"""
+        index = self._first_ending_after(start)
+        while index < len(self.starts) and self.starts[index] < start + duration:
+            start = max(start, self.ends[index])
+            index += 1
+        return start
+
+
+async def load_busy_intervals(
+    session: AsyncSession, user_id: int, start: datetime, end: datetime
+) -> BusyIntervals:
+    """Busy intervals of a user's open tasks that fall in [start, end)"""
+    statement = select(Task.due_at).where(
+        Task.user_id == user_id,
+        Task.status != Status.DONE,
+        Task.due_at > start,
+        Task.due_at < end + TASK_BLOCK,
+    )
+    due_dates = (await session.exec(statement)).all()
+    return BusyIntervals((as_utc(due) - TASK_BLOCK, as_utc(due)) for due in due_dates)
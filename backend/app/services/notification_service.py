@@ -1,48 +1,49 @@
 """Notification service for web push and email"""
 
-from sqlmodel import Session, select
+import json
+from typing import Optional
 
-from app.db import engine
+from app.core.config import settings
 from app.models.user import User
 from app.models.task import Task
 from app.models.notification import Notification
 from app.models.push_subscription import PushSubscription
 from app.core.email import send_email
-
-
-def send_web_push(user_id: int, notification: Notification) -> None:
-    """Send web push notification"""
-    with Session(engine) as session:
-        # Get user's push subscriptions
-        statement = select(PushSubscription).where(PushSubscription.user_id == user_id)
-        subscriptions = session.exec(statement).all()
-
-        if not subscriptions:
-            return  # No subscriptions
-
-        # For now, we'll just log - full web push implementation would use pywebpush
-        # This requires VAPID keys and proper web push library
-        print(f"[WEB PUSH] Would send to {len(subscriptions)} subscriptions for notification {notification.id}")
-        # TODO: Implement actual web push using pywebpush library
-
-
-def send_email_notification(user_id: int, task: Task, notification: Notification) -> None:
-    """Send email notification for a task"""
-    with Session(engine) as session:
-        statement = select(User).where(User.id == user_id)
-        user = session.exec(statement).first()
-
-        if not user:
-            return
-
-        subject = f"Reminder: {task.title}"
-        body = f"""
-        <h2>Task Reminder</h2>
-        <p><strong>{task.title}</strong></p>
-        {f'<p>{task.description}</p>' if task.description else ''}
-        <p>Due: {task.due_at.strftime('%Y-%m-%d %H:%M') if task.due_at else 'No deadline'}</p>
-        <p>Priority: {task.priority.value}</p>
-        """
-
-        send_email(user.email, subject, body)
-
+from app.services.web_push import PushFeedback, web_push_sender
+
+
+async def send_web_push(
+    subscriptions: list[PushSubscription],
+    notification: Notification,
+    feedback: Optional[PushFeedback] = None,
+) -> bool:
+    """
+    Send web push notification to a user's (already loaded) subscriptions
+    Returns True if at least one push service accepted it; per-subscription
+    outcomes go to `feedback`, if given.
+    """
+    if not subscriptions:
+        return False  # No subscriptions
+
+    if not settings.VAPID_PRIVATE_KEY:
+        print(f"[WEB PUSH NOT CONFIGURED] Would send to {len(subscriptions)} subscriptions")
+        return False
+
+    statuses = await web_push_sender().send_all(subscriptions, json.dumps(notification.payload_json))
+    if feedback is not None:
+        feedback.record(subscriptions, statuses)
+    return any(200 <= status < 300 for status in statuses)
+
+
+async def send_email_notification(user: User, task: Task) -> bool:
+    """Send email notification for a task; returns whether it was sent"""
+    subject = f"Reminder: {task.title}"
+    body = f"""
+    <h2>Task Reminder</h2>
+    <p><strong>{task.title}</strong></p>
+    {f'<p>{task.description}</p>' if task.description else ''}
+    <p>Due: {task.due_at.strftime('%Y-%m-%d %H:%M') if task.due_at else 'No deadline'}</p>
+    <p>Priority: {task.priority.value}</p>
+    """
+
+    return await send_email(user.email, subject, body)
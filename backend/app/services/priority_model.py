@@ -0,0 +1,294 @@
+"""Trained priority models: on-disk store, in-process LRU cache and incremental training"""
+
+import asyncio
+import os
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sqlmodel import func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.task import Priority, Task
+
+# Sorted, as SGDClassifier orders classes_ (and so the rows of coef_)
+CLASSES = np.array(sorted(priority.value for priority in Priority))
+
+# Stateless feature hashing: no vocabulary to store, so a model is just its weights
+N_FEATURES = 2**12
+vectorizer = HashingVectorizer(
+    n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False, norm="l2"
+)
+
+# Passes over each training delta; small deltas need a few to move the weights
+TRAINING_EPOCHS = 5
+
+# Tasks updated in the last few minutes may still be in open transactions;
+# training stops short of them so the watermark never skips a late commit
+TRAINING_LAG = timedelta(minutes=5)
+
+# Marks "no model on disk" in the cache so misses don't hit the filesystem;
+# kept briefly, so a model trained by another process shows up soon
+_NO_MODEL = object()
+
+
+class PriorityModel(NamedTuple):
+    """Weights of a linear classifier over hashed title/description features"""
+
+    coef: np.ndarray  # (len(CLASSES), N_FEATURES)
+    intercept: np.ndarray  # (len(CLASSES),)
+    t: float  # SGD step counter, keeps the learning-rate schedule across runs
+    samples: int
+    trained_through: Optional[datetime]  # watermark on Task.updated_at
+
+
+model_cache = TTLCache(maxsize=settings.MODEL_CACHE_SIZE, ttl=settings.MODEL_CACHE_TTL_SECONDS)
+
+# Models are read from the store on these threads, never on the event loop;
+# a load in progress is shared by every request waiting for the same model
+_load_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-load")
+_loading: dict[Optional[int], Future] = {}
+_loading_lock = threading.Lock()
+
+# Inference calls that gave up because loading the model blew the budget
+budget_exceeded = 0
+
+
+def model_path(user_id: Optional[int]) -> Path:
+    """Store location of a user's model, or of the global model for user_id=None"""
+    name = "global" if user_id is None else f"user_{user_id}"
+    return Path(settings.MODEL_STORE_DIR) / f"{name}.npz"
+
+
+def load_model(user_id: Optional[int]) -> Optional[PriorityModel]:
+    """Read a model from the store, or None if it was never trained"""
+    try:
+        with np.load(model_path(user_id)) as data:
+            trained_through = str(data["trained_through"])
+            return PriorityModel(
+                coef=data["coef"].astype(np.float64),
+                intercept=data["intercept"].astype(np.float64),
+                t=float(data["t"]),
+                samples=int(data["samples"]),
+                trained_through=datetime.fromisoformat(trained_through) if trained_through else None,
+            )
+    except FileNotFoundError:
+        return None
+
+
+def save_model(user_id: Optional[int], model: PriorityModel) -> None:
+    """Write a model atomically (readers see the old or the new file, never half of one)"""
+    path = model_path(user_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            np.savez_compressed(
+                tmp,
+                coef=model.coef.astype(np.float32),
+                intercept=model.intercept.astype(np.float32),
+                t=model.t,
+                samples=model.samples,
+                trained_through=model.trained_through.isoformat() if model.trained_through else "",
+            )
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+    model_cache.invalidate(user_id)
+
+
+def _load_into_cache(user_id: Optional[int]) -> Optional[PriorityModel]:
+    model = load_model(user_id)
+    if model is None:
+        model_cache.set(user_id, _NO_MODEL, ttl=settings.MODEL_MISS_CACHE_TTL_SECONDS)
+    else:
+        model_cache.set(user_id, model)
+    return model
+
+
+def _start_load(user_id: Optional[int]) -> Future:
+    """Load a model into the cache on the loader threads (once per model at a time)"""
+    with _loading_lock:
+        future = _loading.get(user_id)
+        if future is not None:
+            return future
+        future = _load_executor.submit(_load_into_cache, user_id)
+        _loading[user_id] = future
+    # Outside the lock: the callback runs right here if the load already finished
+    future.add_done_callback(lambda _: _forget_load(user_id, future))
+    return future
+
+
+def _forget_load(user_id: Optional[int], future: Future) -> None:
+    with _loading_lock:
+        if _loading.get(user_id) is future:
+            del _loading[user_id]
+
+
+def _usable(model: Optional[PriorityModel]) -> bool:
+    if model is None or model is _NO_MODEL:
+        return False
+    return model.samples >= settings.MODEL_MIN_TASKS
+
+
+def _candidate_models(user_id: int) -> list:
+    """
+    The user's model, then the global one, as far as they may be needed
+    Cached entries are returned as they are; for missing ones a load is
+    started right away and its future returned in their place.
+    """
+    candidates = []
+    for owner in (user_id, None):
+        model = model_cache.get(owner)
+        if model is None:
+            candidates.append(_start_load(owner))
+        elif _usable(model):
+            candidates.append(model)
+            break
+    return candidates
+
+
+async def _first_usable(candidates: list) -> Optional[PriorityModel]:
+    for candidate in candidates:
+        if isinstance(candidate, Future):
+            # Shielded: the load finishes and fills the cache even if the
+            # request stops waiting for it
+            candidate = await asyncio.shield(asyncio.wrap_future(candidate))
+        if _usable(candidate):
+            return candidate
+    return None
+
+
+async def predict_priorities(user_id: int, texts: list[str]) -> Optional[list[Priority]]:
+    """
+    Predict a priority per text with the user's (or the global) model
+    Cached models answer right away. Otherwise the model is loaded off the
+    event loop, and if that doesn't finish within MODEL_INFERENCE_BUDGET_MS
+    this returns None so callers fall back to the heuristic; the load carries
+    on and the next request finds the model cached.
+    """
+    global budget_exceeded
+
+    candidates = _candidate_models(user_id)
+    if any(isinstance(candidate, Future) for candidate in candidates):
+        try:
+            model = await asyncio.wait_for(
+                _first_usable(candidates), timeout=settings.MODEL_INFERENCE_BUDGET_MS / 1000
+            )
+        except asyncio.TimeoutError:
+            budget_exceeded += 1
+            return None
+    else:
+        model = candidates[-1] if candidates else None
+    if model is None:
+        return None
+
+    scores = vectorizer.transform(texts) @ model.coef.T + model.intercept
+    return [Priority(CLASSES[index]) for index in np.argmax(scores, axis=1)]
+
+
+def _fit(model: Optional[PriorityModel], texts: list[str], labels: list[str]) -> PriorityModel:
+    """Continue SGD training of `model` (or a fresh one) on new examples"""
+    classifier = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+    if model is not None:
+        classifier.classes_ = CLASSES
+        classifier.coef_ = model.coef.copy()
+        classifier.intercept_ = model.intercept.copy()
+        classifier.t_ = model.t
+        classifier.n_features_in_ = N_FEATURES
+
+    features = vectorizer.transform(texts)
+    for _ in range(TRAINING_EPOCHS):
+        classifier.partial_fit(features, labels, classes=CLASSES)
+
+    return PriorityModel(
+        coef=classifier.coef_,
+        intercept=classifier.intercept_,
+        t=classifier.t_,
+        samples=(model.samples if model else 0) + len(texts),
+        trained_through=model.trained_through if model else None,
+    )
+
+
+def _example(title: str, description: Optional[str]) -> str:
+    return f"{title} {description or ''}"
+
+
+async def train_priority_models(session: AsyncSession, full: bool = False) -> dict:
+    """
+    Incrementally train the global model and per-user models
+    Only tasks updated since the global model's watermark are read, so a
+    nightly run costs the day's changes rather than the whole table. Users get
+    their own model once they have MODEL_MIN_TASKS tasks; that first fit reads
+    their history once. `full` discards stored models and retrains from scratch.
+    """
+    cutoff = datetime.now(timezone.utc) - TRAINING_LAG
+    global_model = None if full else load_model(None)
+    since = global_model.trained_through if global_model else None
+
+    statement = select(Task.user_id, Task.title, Task.description, Task.priority).where(
+        Task.updated_at <= cutoff
+    )
+    if since is not None:
+        statement = statement.where(Task.updated_at > since)
+
+    texts: list[str] = []
+    labels: list[str] = []
+    by_user: dict[int, tuple[list[str], list[str]]] = defaultdict(lambda: ([], []))
+    result = await session.stream(statement.execution_options(yield_per=1000))
+    async for user_id, title, description, priority in result:
+        text = _example(title, description)
+        texts.append(text)
+        labels.append(priority.value)
+        by_user[user_id][0].append(text)
+        by_user[user_id][1].append(priority.value)
+
+    if texts:
+        global_model = _fit(global_model, texts, labels)
+    if global_model is not None:
+        save_model(None, global_model._replace(trained_through=cutoff))
+
+    # Users crossing the threshold are bootstrapped from their full history
+    user_models = {user_id: None if full else load_model(user_id) for user_id in by_user}
+    new_users = [user_id for user_id, model in user_models.items() if model is None]
+    eligible = set()
+    if new_users:
+        counts = select(Task.user_id).where(
+            Task.user_id.in_(new_users), Task.updated_at <= cutoff
+        ).group_by(Task.user_id).having(func.count(Task.id) >= settings.MODEL_MIN_TASKS)
+        eligible = set((await session.exec(counts)).all())
+
+    trained_users = 0
+    for user_id, model in user_models.items():
+        if model is None:
+            if user_id not in eligible:
+                continue
+            history = select(Task.title, Task.description, Task.priority).where(
+                Task.user_id == user_id, Task.updated_at <= cutoff
+            )
+            rows = (await session.exec(history)).all()
+            user_texts = [_example(title, description) for title, description, _ in rows]
+            user_labels = [priority.value for _, _, priority in rows]
+        else:
+            user_texts, user_labels = by_user[user_id]
+
+        model = _fit(model, user_texts, user_labels)
+        save_model(user_id, model._replace(trained_through=cutoff))
+        trained_users += 1
+
+    return {"samples": len(texts), "users": trained_users, "trained_through": cutoff}
+
+
+def model_cache_stats() -> dict:
+    """Cache counters plus how often inference fell back for latency"""
+    return {**model_cache.stats(), "budget_exceeded": budget_exceeded}
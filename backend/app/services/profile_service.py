@@ -0,0 +1,125 @@
+"""Maintenance of per-user feature profiles for the AI suggestion engine"""
+
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from sqlalchemy import delete
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.dates import as_utc
+from app.db import dialect_insert
+from app.models.task import Task, Priority, Status
+from app.models.user_feature_profile import UserFeatureProfile
+from app.services.stats_service import TaskStatsState
+
+PRIORITY_COLUMNS = {
+    Priority.LOW: "low_count",
+    Priority.MEDIUM: "medium_count",
+    Priority.HIGH: "high_count",
+}
+
+
+def _apply(profile: UserFeatureProfile, state: Optional[TaskStatsState], sign: int) -> None:
+    """Add (sign=1) or remove (sign=-1) one task's contribution to a profile"""
+    if state is None:
+        return
+
+    profile.total_tasks += sign
+    column = PRIORITY_COLUMNS[state.priority]
+    setattr(profile, column, getattr(profile, column) + sign)
+
+    if state.status == Status.DONE and state.due_at is not None:
+        hours = list(profile.completion_hours)  # reassign so the JSON change is tracked
+        hours[as_utc(state.due_at).hour] += sign
+        profile.completion_hours = hours
+
+
+def _build_profile(user_id: int, states: Iterable[TaskStatsState]) -> UserFeatureProfile:
+    profile = UserFeatureProfile(user_id=user_id)
+    for state in states:
+        _apply(profile, state, 1)
+    return profile
+
+
+async def _load_task_states(session: AsyncSession, user_id: int) -> list[TaskStatsState]:
+    statement = select(
+        Task.user_id, Task.created_at, Task.status, Task.due_at, Task.priority
+    ).where(Task.user_id == user_id)
+    return [TaskStatsState(*row) for row in (await session.exec(statement)).all()]
+
+
+async def _create_profile(session: AsyncSession, user_id: int) -> UserFeatureProfile:
+    """
+    Build a missing profile from the tasks table and store it
+    ON CONFLICT DO NOTHING lets concurrent first writers race safely.
+    """
+    profile = _build_profile(user_id, await _load_task_states(session, user_id))
+    values = profile.model_dump()
+    await session.exec(
+        dialect_insert(session)(UserFeatureProfile.__table__)
+        .values(**values)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    return await session.get(UserFeatureProfile, user_id, with_for_update=True)
+
+
+async def apply_task_profile_change(
+    session: AsyncSession,
+    before: Optional[TaskStatsState],
+    after: Optional[TaskStatsState],
+) -> None:
+    """
+    Update a user's profile for a task going from `before` to `after`
+    Call after the task change is flushed: a missing profile is built from
+    the tasks table, which then already reflects `after`.
+    """
+    state = after or before
+    statement = (
+        select(UserFeatureProfile)
+        .where(UserFeatureProfile.user_id == state.user_id)
+        .with_for_update()
+    )
+    profile = (await session.exec(statement)).first()
+    if profile is None:
+        await _create_profile(session, state.user_id)
+        return
+
+    _apply(profile, before, -1)
+    _apply(profile, after, 1)
+    profile.updated_at = datetime.now(timezone.utc)
+    session.add(profile)
+
+
+async def get_feature_profile(session: AsyncSession, user_id: int) -> UserFeatureProfile:
+    """Load a user's profile, building it once from task history if missing"""
+    profile = await session.get(UserFeatureProfile, user_id)
+    if profile is None:
+        profile = await _create_profile(session, user_id)
+        await session.commit()
+    return profile
+
+
+async def rebuild_feature_profiles(session: AsyncSession, user_id: Optional[int] = None) -> int:
+    """
+    Drop and recompute profiles from the tasks table (backfill / repair)
+    Rebuilds one user, or everyone when user_id is None. Returns profiles written.
+    """
+    clear = delete(UserFeatureProfile)
+    statement = select(Task.user_id, Task.created_at, Task.status, Task.due_at, Task.priority)
+    if user_id is not None:
+        clear = clear.where(UserFeatureProfile.user_id == user_id)
+        statement = statement.where(Task.user_id == user_id)
+
+    profiles: dict[int, UserFeatureProfile] = {}
+    result = await session.stream(statement.execution_options(yield_per=1000))
+    async for row in result:
+        state = TaskStatsState(*row)
+        if state.user_id not in profiles:
+            profiles[state.user_id] = UserFeatureProfile(user_id=state.user_id)
+        _apply(profiles[state.user_id], state, 1)
+
+    await session.exec(clear)
+    session.add_all(profiles.values())
+    await session.commit()
+    return len(profiles)
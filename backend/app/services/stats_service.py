@@ -0,0 +1,130 @@
+"""Maintenance of the per-user daily stats rollup"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, insert
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.dates import utc_day
+from app.db import dialect_insert
+from app.services.analytics_cache import bump_user_data_version
+from app.models.task import Task, Priority, Status
+from app.models.user_daily_stats import UserDailyStats
+
+STAT_COLUMNS = ("created_count", "completed_count", "open_due_count")
+
+# (day, column) -> delta
+StatsDelta = dict[tuple[date, str], int]
+
+
+class TaskStatsState(NamedTuple):
+    """The task fields per-user derived data (rollup, feature profile) depends on"""
+
+    user_id: int
+    created_at: datetime
+    status: Status
+    due_at: Optional[datetime]
+    priority: Priority
+
+
+def task_stats_state(task: Task) -> TaskStatsState:
+    """Snapshot a task before it is mutated or deleted"""
+    return TaskStatsState(task.user_id, task.created_at, task.status, task.due_at, task.priority)
+
+
+def _contributions(state: Optional[TaskStatsState]) -> StatsDelta:
+    """Counts a single task adds to the rollup"""
+    if state is None:
+        return {}
+
+    created_day = utc_day(state.created_at)
+    counts = {(created_day, "created_count"): 1}
+    if state.status == Status.DONE:
+        counts[(created_day, "completed_count")] = 1
+    elif state.due_at is not None:
+        counts[(utc_day(state.due_at), "open_due_count")] = 1
+    return counts
+
+
+def _increment(session: AsyncSession, values: dict):
+    """INSERT ... ON CONFLICT (user_id, day) DO UPDATE SET col = col + delta"""
+    table = UserDailyStats.__table__
+    statement = dialect_insert(session)(table).values(**values)
+    update = {column: table.c[column] + values[column] for column in STAT_COLUMNS}
+    return statement.on_conflict_do_update(index_elements=["user_id", "day"], set_=update)
+
+
+async def apply_task_stats_change(
+    session: AsyncSession,
+    before: Optional[TaskStatsState],
+    after: Optional[TaskStatsState],
+) -> None:
+    """
+    Apply the rollup delta of a task going from `before` to `after`
+    (None for create/delete). Runs in the caller's transaction, using atomic
+    increments so concurrent writers for the same user/day don't race.
+    """
+    delta: StatsDelta = defaultdict(int)
+    for key, count in _contributions(after).items():
+        delta[key] += count
+    for key, count in _contributions(before).items():
+        delta[key] -= count
+
+    state = after or before
+    by_day: dict[date, dict[str, int]] = defaultdict(lambda: dict.fromkeys(STAT_COLUMNS, 0))
+    for (day, column), count in delta.items():
+        if count:
+            by_day[day][column] = count
+
+    for day, counts in sorted(by_day.items()):
+        await session.exec(_increment(session, {"user_id": state.user_id, "day": day, **counts}))
+
+
+async def rebuild_user_daily_stats(session: AsyncSession, user_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollup from the tasks table (backfill / repair)
+    Rebuilds one user, or everyone when user_id is None. Returns rows written.
+    """
+    clear = delete(UserDailyStats)
+    statement = select(Task.user_id, Task.created_at, Task.status, Task.due_at, Task.priority)
+    if user_id is not None:
+        clear = clear.where(UserDailyStats.user_id == user_id)
+        statement = statement.where(Task.user_id == user_id)
+
+    rows: dict[tuple[int, date], dict[str, int]] = defaultdict(
+        lambda: dict.fromkeys(STAT_COLUMNS, 0)
+    )
+    result = await session.stream(statement.execution_options(yield_per=1000))
+    async for task in result:
+        state = TaskStatsState(*task)
+        for (day, column), count in _contributions(state).items():
+            rows[(state.user_id, day)][column] += count
+
+    await session.exec(clear)
+    if rows:
+        await session.exec(
+            insert(UserDailyStats),
+            params=[
+                {"user_id": row_user_id, "day": day, **counts}
+                for (row_user_id, day), counts in rows.items()
+            ],
+        )
+    await bump_user_data_version(session, user_id)
+    await session.commit()
+    return len(rows)
+
+
+async def backfill_user_daily_stats(session: AsyncSession) -> int:
+    """
+    Build the rollup if it is empty while tasks exist (dev startup)
+    Covers databases filled before the rollup existed or by direct inserts.
+    Returns rows written.
+    """
+    has_stats = (await session.exec(select(UserDailyStats.user_id).limit(1))).first()
+    has_tasks = (await session.exec(select(Task.id).limit(1))).first()
+    if has_stats is not None or has_tasks is None:
+        return 0
+    return await rebuild_user_daily_stats(session)
@@ -1,17 +1,41 @@
 """Task service with reminder scheduling"""
 
 from datetime import datetime, timezone
+from typing import Optional
 
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.models.task import Task
+from app.models.task import Status, Task
 from app.schemas.task import TaskCreate, TaskUpdate
-from app.core.scheduler import scheduler
-from app.jobs.reminder_job import send_reminder
+from app.core.dates import as_utc
+from app.jobs.reminder_job import cancel_reminder, lease_for_write, schedule_reminder
+from app.services.analytics_cache import bump_user_data_version
+from app.services.profile_service import apply_task_profile_change
+from app.services.stats_service import (
+    TaskStatsState,
+    apply_task_stats_change,
+    task_stats_state,
+)
+
+
+async def _record_task_change(
+    session: AsyncSession,
+    before: Optional[TaskStatsState],
+    after: Optional[TaskStatsState],
+) -> None:
+    """
+    Keep per-user derived data in step with a task write
+    Daily stats, feature profile and the analytics data version change in
+    the write's own transaction.
+    """
+    await session.flush()
+    await apply_task_stats_change(session, before, after)
+    await apply_task_profile_change(session, before, after)
+    await bump_user_data_version(session, (after or before).user_id)
 
 
 async def create_task_with_reminder(
-    session: Session, user_id: int, task_data: TaskCreate
+    session: AsyncSession, user_id: int, task_data: TaskCreate
 ) -> Task:
     """Create a task and schedule reminder if needed"""
     task = Task(
@@ -19,32 +43,28 @@ async def create_task_with_reminder(
         title=task_data.title,
         description=task_data.description,
         priority=task_data.priority,
-        due_at=task_data.due_at,
-        remind_at=task_data.remind_at,
+        due_at=as_utc(task_data.due_at),
+        remind_at=as_utc(task_data.remind_at),
     )
+    lease_for_write(task)
     session.add(task)
-    session.commit()
-    session.refresh(task)
-
-    # Schedule reminder if remind_at is set and in the future
-    if task.remind_at and task.remind_at > datetime.now(timezone.utc):
-        job_id = f"reminder:{task.id}"
-        scheduler.add_job(
-            send_reminder,
-            "date",
-            run_date=task.remind_at,
-            id=job_id,
-            args=[task.id],
-            replace_existing=True,
-        )
+    await _record_task_change(session, None, task_stats_state(task))
+    await session.commit()
+    await session.refresh(task)
+
+    # Schedule reminder if it falls in the loader's window
+    schedule_reminder(task)
 
     return task
 
 
 async def update_task_with_reminder(
-    session: Session, task: Task, task_data: TaskUpdate
+    session: AsyncSession, task: Task, task_data: TaskUpdate
 ) -> Task:
     """Update a task and reschedule reminder if needed"""
+    stats_before = task_stats_state(task)
+    reminder_before = (as_utc(task.remind_at), task.status == Status.DONE)
+
     # Update fields
     if task_data.title is not None:
         task.title = task_data.title
@@ -53,71 +73,36 @@ async def update_task_with_reminder(
     if task_data.priority is not None:
         task.priority = task_data.priority
     if task_data.due_at is not None:
-        task.due_at = task_data.due_at
+        task.due_at = as_utc(task_data.due_at)
     if task_data.remind_at is not None:
-        task.remind_at = task_data.remind_at
+        task.remind_at = as_utc(task_data.remind_at)
     if task_data.status is not None:
         task.status = task_data.status
 
     task.updated_at = datetime.now(timezone.utc)
+    # Most edits leave the reminder alone; only a new time or a change to or
+    # from done moves its lease and timer
+    reminder_changed = (as_utc(task.remind_at), task.status == Status.DONE) != reminder_before
+    if reminder_changed:
+        lease_for_write(task)
     session.add(task)
-    session.commit()
-    session.refresh(task)
-
-    # Remove old reminder job
-    job_id = f"reminder:{task.id}"
-    try:
-        scheduler.remove_job(job_id)
-    except Exception:
-        pass  # Job might not exist
-
-    # Schedule new reminder if needed
-    if task.remind_at and task.remind_at > datetime.now(timezone.utc):
-        scheduler.add_job(
-            send_reminder,
-            "date",
-            run_date=task.remind_at,
-            id=job_id,
-            args=[task.id],
-            replace_existing=True,
-        )
+    await _record_task_change(session, stats_before, task_stats_state(task))
+    await session.commit()
+    await session.refresh(task)
+
+    # Reschedule, or drop the timer if the reminder left the window
+    if reminder_changed:
+        schedule_reminder(task)
 
     return task
 
 
-async def delete_task_with_reminder(session: Session, task: Task) -> None:
-    """Delete a task and remove its reminder job"""
-    # Remove reminder job
-    job_id = f"reminder:{task.id}"
-    try:
-        scheduler.remove_job(job_id)
-    except Exception:
-        pass  # Job might not exist
-
-    session.delete(task)
-    session.commit()
-
-
-async def rebuild_reminder_jobs() -> None:
-    """Rebuild reminder jobs from existing tasks on startup"""
-    from app.db import engine
-    from sqlmodel import Session, select
-
-    with Session(engine) as session:
-        statement = select(Task).where(
-            Task.remind_at.isnot(None),
-            Task.remind_at > datetime.now(timezone.utc),
-        )
-        tasks = session.exec(statement).all()
-
-        for task in tasks:
-            job_id = f"reminder:{task.id}"
-            scheduler.add_job(
-                send_reminder,
-                "date",
-                run_date=task.remind_at,
-                id=job_id,
-                args=[task.id],
-                replace_existing=True,
-            )
+async def delete_task_with_reminder(session: AsyncSession, task: Task) -> None:
+    """Delete a task and remove its reminder timer"""
+    # Remove reminder timer
+    cancel_reminder(task.id)
 
+    stats_before = task_stats_state(task)
+    await session.delete(task)
+    await _record_task_change(session, stats_before, None)
+    await session.commit()
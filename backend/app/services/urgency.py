@@ -0,0 +1,100 @@
+"""Weighted, multi-language urgency lexicon compiled into a single regex"""
+
+import functools
+import json
+import re
+from pathlib import Path
+from typing import Iterable
+
+from app.core.config import settings
+
+DEFAULT_LEXICON_PATH = Path(__file__).with_name("urgency_lexicon.json")
+
+
+def _normalize(term: str) -> str:
+    return " ".join(term.lower().split())
+
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """
+    Regex alternation of phrases, factored into a prefix trie
+    ("deadline|deadlines|dringend" -> "d(?:eadline(?:s)?|ringend)") so the
+    engine tries each character once instead of every phrase at every position.
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}  # a phrase ends here
+
+    def compile_node(node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + compile_node(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" in node:
+            return f"(?:{pattern})?"
+        return pattern
+
+    return compile_node(trie)
+
+
+class UrgencyLexicon:
+    """
+    Scores text against weighted urgency terms in one regex pass
+    Matching is case-insensitive on whole words and phrases; a term preceded by
+    a negation (up to `negation_gap` words earlier, as in "not very urgent")
+    scores nothing.
+    """
+
+    def __init__(
+        self,
+        terms: dict[str, float],
+        negations: Iterable[str] = (),
+        negation_gap: int = 1,
+        threshold: float = 1.0,
+    ) -> None:
+        self.weights = {_normalize(term): weight for term, weight in terms.items()}
+        self.threshold = threshold
+
+        negation_terms = [_normalize(negation) for negation in negations]
+        # Without negations the group is kept but can never match
+        negation_pattern = _trie_pattern(negation_terms) if negation_terms else "(?!)"
+        negation = rf"(?P<negation>\b{negation_pattern}\W+(?:\w+\W+){{0,{negation_gap}}})?"
+        self._pattern = re.compile(
+            rf"{negation}\b(?P<term>{_trie_pattern(self.weights)})\b", re.IGNORECASE
+        )
+
+    @classmethod
+    def from_file(cls, path: Path) -> "UrgencyLexicon":
+        """Load a lexicon JSON file (see urgency_lexicon.json for the format)"""
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            terms=data["terms"],
+            negations=data.get("negations", ()),
+            negation_gap=data.get("negation_gap", 1),
+            threshold=data.get("threshold", 1.0),
+        )
+
+    def score(self, text: str) -> float:
+        """Sum of the weights of non-negated terms found in text"""
+        return sum(
+            self.weights[_normalize(match.group("term"))]
+            for match in self._pattern.finditer(text)
+            if not match.group("negation")
+        )
+
+    def is_urgent(self, text: str) -> bool:
+        return self.score(text) >= self.threshold
+
+
+@functools.cache
+def urgency_lexicon() -> UrgencyLexicon:
+    """The configured lexicon (URGENCY_LEXICON_PATH, else the bundled one), compiled once"""
+    return UrgencyLexicon.from_file(Path(settings.URGENCY_LEXICON_PATH or DEFAULT_LEXICON_PATH))
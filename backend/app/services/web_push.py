@@ -0,0 +1,204 @@
+"""Web Push delivery over a shared keep-alive HTTP client with cached VAPID headers"""
+
+import asyncio
+import base64
+import functools
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+from cryptography.hazmat.primitives.asymmetric import ec
+from py_vapid import Vapid
+from pywebpush import WebPushException, WebPusher
+from sqlalchemy import delete, update
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.models.push_subscription import PushSubscription
+
+# VAPID tokens are signed for 12 hours and re-signed an hour before they expire
+VAPID_TOKEN_LIFETIME = 12 * 60 * 60
+VAPID_RENEW_BEFORE = 60 * 60
+
+# Status reported for a push that never got an HTTP response
+TRANSPORT_ERROR = 0
+# Status reported for a subscription whose keys the message can't be encrypted to
+INVALID_KEYS = -1
+
+# The push service no longer knows the subscription (unsubscribed or expired)
+GONE_STATUSES = frozenset({404, 410})
+# Throttling says nothing about the subscription itself
+NOT_A_FAILURE = frozenset({429})
+
+
+def valid_subscription_keys(p256dh: str, auth: str) -> bool:
+    """Whether a browser's p256dh (P-256 point) and auth (16 bytes) keys are usable"""
+    try:
+        ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), _b64decode(p256dh))
+        return len(_b64decode(auth)) == 16
+    except ValueError:  # Includes binascii.Error
+        return False
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+class WebPushSender:
+    """
+    Encrypts and posts Web Push messages, fanning out concurrently
+    pywebpush.webpush() parses the VAPID key and signs a fresh JWT for every
+    message and opens a new connection each time; here the key is parsed
+    once, the signed Authorization header is reused per push service until
+    shortly before it expires, and all requests share one httpx client (and
+    its keep-alive connections) per event loop.
+    """
+
+    def __init__(
+        self,
+        private_key: str,
+        subject: str,
+        ttl: int = 3600,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+    ) -> None:
+        self.vapid = Vapid.from_string(private_key)
+        self.subject = subject
+        self.ttl = ttl
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._vapid_headers: dict[str, tuple[float, dict]] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def vapid_headers(self, endpoint: str) -> dict:
+        """Signed VAPID headers for the endpoint's push service (cached)"""
+        url = urlsplit(endpoint)
+        audience = f"{url.scheme}://{url.netloc}"
+        now = time.time()
+        cached = self._vapid_headers.get(audience)
+        if cached is None or cached[0] - VAPID_RENEW_BEFORE <= now:
+            expires = int(now) + VAPID_TOKEN_LIFETIME
+            claims = {"sub": self.subject, "aud": audience, "exp": expires}
+            cached = (expires, self.vapid.sign(claims))
+            self._vapid_headers[audience] = cached
+        return cached[1]
+
+    def _http(self) -> httpx.AsyncClient:
+        # A client's connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def send(self, subscription: PushSubscription, data: str) -> int:
+        """Post one encrypted message; returns the push service's HTTP status"""
+        subscription_info = {
+            "endpoint": subscription.endpoint,
+            "keys": {"p256dh": subscription.p256dh, "auth": subscription.auth},
+        }
+        try:
+            body = WebPusher(subscription_info).encode(data, "aes128gcm")["body"]
+        except (WebPushException, ValueError, IndexError) as e:
+            # Malformed p256dh/auth; fails this subscription only
+            print(f"Failed to encrypt web push for {subscription.endpoint}: {e}")
+            return INVALID_KEYS
+        headers = {
+            **self.vapid_headers(subscription.endpoint),
+            "Content-Encoding": "aes128gcm",
+            "Content-Type": "application/octet-stream",
+            "TTL": str(self.ttl),
+        }
+        try:
+            response = await self._http().post(subscription.endpoint, content=body, headers=headers)
+        except httpx.HTTPError as e:
+            print(f"Failed to send web push to {subscription.endpoint}: {e}")
+            return TRANSPORT_ERROR
+        return response.status_code
+
+    async def send_all(self, subscriptions: list[PushSubscription], data: str) -> list[int]:
+        """Send to every subscription at once; statuses in subscription order"""
+        return list(await asyncio.gather(*(self.send(subscription, data) for subscription in subscriptions)))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class PushFeedback:
+    """
+    Per-subscription push outcomes of one reminder batch, written back at once
+    Subscriptions the push service reports gone, or whose keys the message
+    can't be encrypted to, are deleted; other failures bump failure_count and
+    a success resets it, in a few statements on the batch's own session
+    instead of a commit per response. Nothing is written when every push
+    went through to a subscription without failures.
+    """
+
+    def __init__(self) -> None:
+        self.gone: set[int] = set()
+        self.failed: set[int] = set()
+        self.recovered: set[int] = set()
+
+    def record(self, subscriptions: list[PushSubscription], statuses: list[int]) -> None:
+        for subscription, status in zip(subscriptions, statuses):
+            if status in GONE_STATUSES or status == INVALID_KEYS:
+                # Broken keys won't work on a retry either; the browser
+                # subscribes again with fresh ones
+                self.gone.add(subscription.id)
+            elif 200 <= status < 300:
+                if subscription.failure_count:
+                    self.recovered.add(subscription.id)
+            elif status not in NOT_A_FAILURE:
+                self.failed.add(subscription.id)
+
+    def __bool__(self) -> bool:
+        return bool(self.gone or self.failed or self.recovered)
+
+    def apply(self, session: Session) -> None:
+        """Queue the writes on `session`; the caller commits"""
+        # A subscription pushed to more than once in the batch counts once,
+        # and any failure outweighs a success
+        failed = self.failed - self.gone
+        recovered = self.recovered - self.failed - self.gone
+        if self.gone:
+            session.exec(delete(PushSubscription).where(PushSubscription.id.in_(self.gone)))
+        if failed:
+            session.exec(
+                update(PushSubscription)
+                .where(PushSubscription.id.in_(failed))
+                .values(failure_count=PushSubscription.failure_count + 1)
+            )
+        if recovered:
+            session.exec(
+                update(PushSubscription)
+                .where(PushSubscription.id.in_(recovered))
+                .values(failure_count=0)
+            )
+
+
+@functools.cache
+def web_push_sender() -> WebPushSender:
+    """The process-wide sender, created from settings on first use"""
+    return WebPushSender(
+        settings.VAPID_PRIVATE_KEY,
+        settings.VAPID_SUBJECT,
+        ttl=settings.WEB_PUSH_TTL_SECONDS,
+        timeout=settings.WEB_PUSH_TIMEOUT_SECONDS,
+        max_connections=settings.WEB_PUSH_MAX_CONNECTIONS,
+    )
+
+
+async def close_web_push() -> None:
+    """Close the shared HTTP client if push was ever used (shutdown)"""
+    if web_push_sender.cache_info().currsize:
+        await web_push_sender().aclose()
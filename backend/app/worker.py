@@ -0,0 +1,55 @@
+"""Background worker running the scheduler and reminder delivery outside the API
+
+Start with `python -m app.worker` and set RUN_SCHEDULER=false for the API.
+"""
+
+import asyncio
+import logging
+import signal
+
+from app.core.scheduler import scheduler
+from app.jobs.reminder_job import WORKER_ID, reminder_stats, start_reminders, stop_reminders
+from app.jobs.subscription_job import schedule_subscription_sweep
+
+logger = logging.getLogger(__name__)
+
+
+async def drain() -> None:
+    """
+    Stop once in-flight reminders have been delivered
+    No new reminder fires after this is called; deliveries already running
+    finish, and reminders still leased to this worker are released so another
+    worker loads them right away instead of after the lease expires.
+    """
+    await stop_reminders()
+    scheduler.shutdown(wait=True)
+    logger.info("Worker %s drained, reminders: %s", WORKER_ID, reminder_stats.snapshot())
+
+
+async def run(stop: asyncio.Event) -> None:
+    """Run the scheduler and reminder timers until `stop` is set, then drain"""
+    scheduler.start()
+    schedule_subscription_sweep(scheduler)
+    start_reminders()
+    logger.info("Worker %s started", WORKER_ID)
+    try:
+        await stop.wait()
+    finally:
+        await drain()
+
+
+async def _main() -> None:
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+    await run(stop)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    main()
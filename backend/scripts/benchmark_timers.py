@@ -0,0 +1,107 @@
+"""Compare the reminder timer wheel with APScheduler at large numbers of pending timers"""
+
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.schedulers.background import BackgroundScheduler
+
+from app.core.timers import TimerWheel
+
+# Reminder deadlines spread over the loader's 15 minute window
+WINDOW_SECONDS = 15 * 60
+
+
+def _noop(task_id: int) -> None:
+    pass
+
+
+def _timed(label: str, count: int, action) -> None:
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<12} {elapsed:8.3f}s  {elapsed / count * 1e6:8.2f} us/op")
+
+
+def bench_wheel(offsets: list[float]) -> None:
+    wheel = TimerWheel(tick=1.0, slots=1024)
+    now = time.time()
+    keys = [f"reminder:{task_id}" for task_id in range(len(offsets))]
+
+    def insert() -> None:
+        for key, offset, task_id in zip(keys, offsets, range(len(keys))):
+            wheel.schedule(key, now + offset, _noop, task_id)
+
+    def reschedule() -> None:
+        for key, offset, task_id in zip(keys, reversed(offsets), range(len(keys))):
+            wheel.schedule(key, now + offset, _noop, task_id)
+
+    def cancel() -> None:
+        for key in keys:
+            wheel.cancel(key)
+
+    print(f"TimerWheel, {len(keys)} timers")
+    _timed("insert", len(keys), insert)
+    _timed("reschedule", len(keys), reschedule)
+    _timed("cancel", len(keys), cancel)
+
+
+def bench_apscheduler(offsets: list[float]) -> None:
+    # Paused, so only the job store bookkeeping is measured
+    scheduler = BackgroundScheduler(jobstores={"default": MemoryJobStore()}, timezone="UTC")
+    scheduler.start(paused=True)
+    now = datetime.now(timezone.utc)
+    keys = [f"reminder:{task_id}" for task_id in range(len(offsets))]
+
+    def insert() -> None:
+        for key, offset, task_id in zip(keys, offsets, range(len(keys))):
+            scheduler.add_job(
+                _noop, "date", run_date=now + timedelta(seconds=offset), id=key, args=[task_id]
+            )
+
+    def reschedule() -> None:
+        for key, offset in zip(keys, reversed(offsets)):
+            scheduler.reschedule_job(key, trigger="date", run_date=now + timedelta(seconds=offset))
+
+    def cancel() -> None:
+        for key in keys:
+            scheduler.remove_job(key)
+
+    print(f"APScheduler (MemoryJobStore), {len(keys)} jobs")
+    try:
+        _timed("insert", len(keys), insert)
+        _timed("reschedule", len(keys), reschedule)
+        _timed("cancel", len(keys), cancel)
+    finally:
+        scheduler.shutdown(wait=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100_000, 1_000_000], help="pending timer counts"
+    )
+    parser.add_argument(
+        "--skip-apscheduler", action="store_true", help="only run the wheel (APScheduler is slow at 10^6)"
+    )
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for size in args.sizes:
+        offsets = [rng.uniform(0, WINDOW_SECONDS) for _ in range(size)]
+        bench_wheel(offsets)
+        if not args.skip_apscheduler:
+            bench_apscheduler(offsets)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure the cold import time of app.main (what every new API worker pays)"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Heavy optional modules that must not be imported by app.main itself
+DEFERRED_MODULES = ("numpy", "sklearn", "scipy")
+
+
+def measure_once() -> tuple[float, dict[str, int], set[str]]:
+    """Import app.main in a fresh interpreter; returns seconds, self time per package, loaded modules"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    total_us = 0
+    packages: dict[str, int] = {}
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative, indent, module = match.groups()
+        root = module.split(".")[0]
+        loaded.add(root)
+        packages[root] = packages.get(root, 0) + int(self_us)
+        if len(indent) == 1:  # top-level imports: their cumulative times add up to the total
+            total_us += int(cumulative)
+    return total_us / 1e6, packages, loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=10, help="Slowest packages to list")
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    totals = [total for total, _, _ in samples]
+    print(f"import app.main: median {statistics.median(totals) * 1000:.0f} ms "
+          f"(min {min(totals) * 1000:.0f} ms, max {max(totals) * 1000:.0f} ms, {args.runs} runs)")
+
+    _, packages, loaded = samples[-1]
+    print("Slowest packages (last run):")
+    for name, micros in sorted(packages.items(), key=lambda item: item[1], reverse=True)[: args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    if eager:
+        print(f"WARNING: imported eagerly, should be deferred: {', '.join(eager)}")
+        sys.exit(1)
@@ -0,0 +1,34 @@
+"""Backfill or repair per-user derived data (daily stats rollup, AI feature profiles)"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import app
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+
+from app.db import async_engine, async_session_factory
+from app.services.profile_service import rebuild_feature_profiles
+from app.services.stats_service import rebuild_user_daily_stats
+
+
+async def rebuild(user_id: int | None) -> None:
+    """Rebuild derived data for one user or everyone"""
+    async with async_session_factory() as session:
+        rows = await rebuild_user_daily_stats(session, user_id)
+        profiles = await rebuild_feature_profiles(session, user_id)
+    await async_engine.dispose()
+
+    target = f"user {user_id}" if user_id is not None else "all users"
+    print(f"Rebuilt daily stats for {target}: {rows} rows")
+    print(f"Rebuilt feature profiles for {target}: {profiles} profiles")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, default=None, help="Only rebuild this user")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.user_id))
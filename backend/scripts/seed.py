@@ -10,15 +10,17 @@ sys.path.insert(0, str(backend_dir))
 from datetime import datetime, timedelta, timezone
 from sqlmodel import Session, select
 
-from app.db import engine, init_db
+from app.db import async_engine, async_session_factory, engine, init_db
 from app.models.user import User
 from app.models.task import Task, Priority, Status
 from app.core.security import get_password_hash
+from app.services.profile_service import rebuild_feature_profiles
+from app.services.stats_service import rebuild_user_daily_stats
 import asyncio
 
 
-def seed_database():
-    """Create demo user and tasks"""
+def seed_database() -> int:
+    """Create demo user and tasks; returns the demo user's id"""
     with Session(engine) as session:
         # Check if demo user exists
         statement = select(User).where(User.email == "demo@example.com")
@@ -100,8 +102,21 @@ def seed_database():
         print(f"\nDemo credentials:")
         print(f"Email: demo@example.com")
         print(f"Password: demo123")
+        return user.id
+
+
+async def rebuild_derived_data(user_id: int) -> None:
+    """
+    Rebuild the demo user's daily stats and feature profile
+    Tasks above bypass task_service, which keeps both up to date on writes.
+    """
+    async with async_session_factory() as session:
+        await rebuild_user_daily_stats(session, user_id)
+        await rebuild_feature_profiles(session, user_id)
+    await async_engine.dispose()
 
 
 if __name__ == "__main__":
     asyncio.run(init_db())
-    seed_database()
+    user_id = seed_database()
+    asyncio.run(rebuild_derived_data(user_id))
@@ -0,0 +1,32 @@
+"""Incrementally train the AI priority models from task history (run nightly)"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import app
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+import argparse
+import asyncio
+
+from app.core.config import settings
+from app.db import async_engine, async_session_factory
+from app.services.priority_model import train_priority_models
+
+
+async def train(full: bool) -> None:
+    """Train on tasks changed since the last run (or everything with --full)"""
+    async with async_session_factory() as session:
+        result = await train_priority_models(session, full=full)
+    await async_engine.dispose()
+
+    print(f"Trained on {result['samples']} tasks through {result['trained_through'].isoformat()}")
+    print(f"Updated {result['users']} per-user models in {settings.MODEL_STORE_DIR}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--full", action="store_true", help="Discard stored models and retrain from scratch")
+    args = parser.parse_args()
+    asyncio.run(train(args.full))
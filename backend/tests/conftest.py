@@ -1,4 +1,20 @@
 """Pytest configuration and fixtures"""
 
+import sys
+
 import pytest
 
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def model_store(tmp_path, monkeypatch):
+    """Keep every test on an empty, private priority model store"""
+    store = tmp_path / "models"
+    monkeypatch.setattr(settings, "MODEL_STORE_DIR", str(store))
+    yield store
+
+    # Only touch the model cache if a test actually loaded the ML stack
+    priority_model = sys.modules.get("app.services.priority_model")
+    if priority_model is not None:
+        priority_model.model_cache.clear()
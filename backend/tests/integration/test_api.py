@@ -1,30 +1,69 @@
 """Integration tests for API endpoints"""
 
+import asyncio
+import base64
+import time
+from datetime import datetime, timedelta, timezone
+
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
 from fastapi.testclient import TestClient
-from sqlmodel import Session, SQLModel, create_engine
+from sqlalchemy import event, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.main import app
 from app.db import get_session
+from app.api.auth import user_cache
 from app.models.user import User
+from app.models.push_subscription import PushSubscription
+from app.models.task import Task, Priority, Status
+from app.models.user_daily_stats import UserDailyStats
+from app.services import ai_service
+from app.services.analytics_cache import analytics_cache
+from app.models.user_feature_profile import UserFeatureProfile
+from app.services.profile_service import rebuild_feature_profiles
+from app.services.stats_service import backfill_user_daily_stats, rebuild_user_daily_stats
+from app.core.config import settings
 from app.core.security import get_password_hash
 
 
 @pytest.fixture
-def test_db():
+def db_path(tmp_path):
+    """Path of a throwaway SQLite database shared by sync fixtures and the app"""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture
+def test_db(db_path):
     """Create test database"""
-    engine = create_engine("sqlite:///:memory:")
+    engine = create_engine(f"sqlite:///{db_path}")
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
 
 
 @pytest.fixture
-def client(test_db):
+def async_engine(db_path):
+    """Async engine the app uses against the test database"""
+    # NullPool: each TestClient request may run on its own event loop
+    return create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+
+
+@pytest.fixture
+def client(test_db, async_engine):
     """Create test client"""
-    def override_get_session():
-        yield test_db
-    
+    session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def override_get_session():
+        async with session_factory() as session:
+            yield session
+
     app.dependency_overrides[get_session] = override_get_session
+    user_cache.clear()
+    analytics_cache.clear()
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -95,3 +134,390 @@ def test_get_me(client, test_user):
     data = response.json()
     assert data["email"] == "test@example.com"
 
+
+
+def test_get_me_uses_user_cache(client, test_user, test_db):
+    """Repeat calls with the same token are served from the user cache"""
+    login_response = client.post(
+        "/auth/login",
+        json={"email": "test@example.com", "password": "password123"},
+    )
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    hits_before = user_cache.hits
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    assert user_cache.hits == hits_before + 1
+
+    # Deleting the user invalidates its cached tokens
+    test_db.delete(test_user)
+    test_db.commit()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+@pytest.fixture
+def auth_headers(client, test_user):
+    """Authorization header for the test user"""
+    response = client.post(
+        "/auth/login",
+        json={"email": "test@example.com", "password": "password123"},
+    )
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_task_crud(client, auth_headers):
+    """Tasks can be created, listed, updated and deleted"""
+    response = client.post(
+        "/tasks",
+        json={"title": "Write report", "priority": "high"},
+        headers=auth_headers,
+    )
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = client.get("/tasks", headers=auth_headers)
+    assert [task["id"] for task in response.json()] == [task_id]
+
+    response = client.patch(f"/tasks/{task_id}", json={"status": "done"}, headers=auth_headers)
+    assert response.json()["status"] == "done"
+
+    assert client.delete(f"/tasks/{task_id}", headers=auth_headers).status_code == 204
+    assert client.get(f"/tasks/{task_id}", headers=auth_headers).status_code == 404
+
+
+def test_push_subscribe_validates_keys(client, auth_headers, test_db):
+    """Only key material a message can be encrypted to is stored"""
+    public = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    keys = {
+        "p256dh": base64.urlsafe_b64encode(public).decode().rstrip("="),
+        "auth": base64.urlsafe_b64encode(b"0" * 16).decode().rstrip("="),
+    }
+    endpoint = "https://push.example.com/send/1"
+    for broken in ({}, {**keys, "p256dh": "abc"}, {**keys, "auth": ""}, {**keys, "auth": "x"}):
+        response = client.post(
+            "/notifications/subscribe", json={"endpoint": endpoint, "keys": broken}, headers=auth_headers
+        )
+        assert response.status_code == 422
+
+    response = client.post(
+        "/notifications/subscribe", json={"endpoint": endpoint, "keys": keys}, headers=auth_headers
+    )
+    assert response.status_code == 200
+    [subscription] = test_db.exec(select(PushSubscription)).all()
+    assert subscription.p256dh == keys["p256dh"]
+
+
+def test_analytics_and_ai(client, auth_headers):
+    """Analytics and AI endpoints read through the request session"""
+    client.post("/tasks", json={"title": "Urgent fix"}, headers=auth_headers)
+
+    summary = client.get("/analytics/summary", headers=auth_headers).json()
+    assert summary["total_tasks"] == 1
+    assert summary["completed_tasks"] == 0
+
+    response = client.post("/ai/suggest", json={"title": "urgent fix"}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["suggested_priority"] == "high"
+
+
+def test_ai_suggest_batch(client, auth_headers):
+    """Batch suggestions come back in request order and match the single endpoint"""
+    drafts = [{"title": "urgent fix"}, {"title": "Water plants"}, {"description": "deadline"}]
+    response = client.post("/ai/suggest/batch", json=drafts, headers=auth_headers)
+    assert response.status_code == 200
+
+    batch = response.json()
+    assert [s["suggested_priority"] for s in batch] == ["high", "medium", "high"]
+    single = client.post("/ai/suggest", json=drafts[1], headers=auth_headers).json()
+    assert batch[1]["priority_reason"] == single["priority_reason"]
+
+    too_many = [{"title": "t"}] * 101
+    response = client.post("/ai/suggest/batch", json=too_many, headers=auth_headers)
+    assert response.status_code == 422
+
+
+def test_ai_suggest_avoids_upcoming_tasks(client, auth_headers):
+    """Suggested slots don't collide with tasks the user already has due"""
+    due_at = datetime.now(timezone.utc) + timedelta(hours=2, minutes=30)
+    client.post("/tasks", json={"title": "Standup", "due_at": due_at.isoformat()}, headers=auth_headers)
+
+    response = client.post(
+        "/ai/suggest", json={"title": "Review", "estimated_duration_minutes": 45}, headers=auth_headers
+    )
+    first_slot = response.json()["suggested_time_slots"][0]
+    start = datetime.fromisoformat(first_slot["start"])
+    assert start >= due_at
+    assert datetime.fromisoformat(first_slot["end"]) - start == timedelta(minutes=45)
+
+
+def test_ai_status_reports_lazy_ml_backend(client, auth_headers):
+    """The ML backend shows as loaded once a suggestion has needed it"""
+    pytest.importorskip("sklearn")
+    assert client.get("/ai/status").status_code == 401
+    status = client.get("/ai/status", headers=auth_headers).json()
+    assert status["ml_available"] is True
+
+    # The first suggestion starts the load in the background
+    client.post("/ai/suggest", json={"title": "a"}, headers=auth_headers)
+    for _ in range(50):
+        status = client.get("/ai/status", headers=auth_headers).json()
+        if status["ml_loaded"]:
+            break
+        time.sleep(0.1)
+    assert status["ml_loaded"] is True
+    assert "hit_rate" in status["model_cache"]
+
+
+def test_list_tasks_cursor_pagination(client, auth_headers):
+    """Cursor pagination walks every matching task exactly once"""
+    created_ids = []
+    for i in range(5):
+        response = client.post(
+            "/tasks",
+            json={"title": f"Task {i}", "priority": "high" if i % 2 == 0 else "low"},
+            headers=auth_headers,
+        )
+        created_ids.append(response.json()["id"])
+
+    seen = []
+    params = {"size": 2, "priority": "high"}
+    while True:
+        response = client.get("/tasks", params=params, headers=auth_headers)
+        seen.extend(task["id"] for task in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        params["cursor"] = next_cursor
+
+    assert seen == [task_id for task_id in reversed(created_ids)][::2]
+
+    response = client.get("/tasks", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_analytics_summary_single_pass(client, auth_headers, test_db, test_user, async_engine):
+    """Summary counts come from one aggregate query plus the upcoming list"""
+    now = datetime.now(timezone.utc)
+    test_db.add_all([
+        Task(user_id=test_user.id, title="Done", status=Status.DONE),
+        Task(user_id=test_user.id, title="Overdue", due_at=now - timedelta(days=1)),
+        Task(
+            user_id=test_user.id,
+            title="Upcoming",
+            priority=Priority.HIGH,
+            due_at=now + timedelta(days=2),
+        ),
+        Task(user_id=test_user.id, title="Old", created_at=now - timedelta(days=30)),
+    ])
+    test_db.commit()
+    _rebuild_stats(async_engine)
+
+    statements = []
+    event.listen(
+        async_engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    client.get("/auth/me", headers=auth_headers)  # warm the user cache
+    statements.clear()
+
+    summary = client.get("/analytics/summary", headers=auth_headers).json()
+
+    assert len(statements) == 3  # data version, rollup aggregate, upcoming
+    assert summary["total_tasks"] == 4
+    assert summary["completed_tasks"] == 1
+    assert summary["overdue_tasks"] == 1
+    assert summary["completion_rate"] == 25
+    assert summary["tasks_per_day"] == {now.date().isoformat(): 3}
+    assert [task["title"] for task in summary["upcoming_deadlines"]] == ["Upcoming"]
+
+
+def test_tasks_per_day_covers_fifteen_calendar_days(
+    client, auth_headers, test_db, test_user, async_engine
+):
+    """Today plus the 14 UTC days before it, whole days, oldest day included"""
+    now = datetime.now(timezone.utc)
+    test_db.add_all([
+        Task(user_id=test_user.id, title=f"{days} days ago", created_at=now - timedelta(days=days))
+        for days in (0, 14, 15)
+    ])
+    test_db.commit()
+    _rebuild_stats(async_engine)
+
+    summary = client.get("/analytics/summary", headers=auth_headers).json()
+    assert summary["tasks_per_day"] == {
+        now.date().isoformat(): 1,
+        (now.date() - timedelta(days=14)).isoformat(): 1,
+    }
+    assert summary["total_tasks"] == 3
+
+
+def _rebuild_stats(async_engine):
+    async def rebuild():
+        async with AsyncSession(async_engine) as session:
+            await rebuild_user_daily_stats(session)
+
+    asyncio.run(rebuild())
+
+
+def test_empty_rollup_is_backfilled(test_db, test_user, async_engine):
+    """Tasks inserted behind task_service's back get a rollup on dev startup"""
+    test_db.add_all([Task(user_id=test_user.id, title=f"T{i}") for i in range(3)])
+    test_db.commit()
+
+    async def backfill() -> list[int]:
+        async with AsyncSession(async_engine) as session:
+            return [await backfill_user_daily_stats(session) for _ in range(2)]
+
+    assert asyncio.run(backfill()) == [1, 0]  # nothing to do once filled
+    assert {created for _, created, _, _ in _daily_stats(test_db)} == {3}
+
+
+def _daily_stats(test_db):
+    test_db.expire_all()
+    return {
+        (row.day, row.created_count, row.completed_count, row.open_due_count)
+        for row in test_db.exec(select(UserDailyStats)).all()
+        if row.created_count or row.completed_count or row.open_due_count
+    }
+
+
+def test_daily_stats_maintained_incrementally(client, auth_headers, test_db, async_engine):
+    """Task writes keep the rollup equal to a full rebuild"""
+    due_at = (datetime.now(timezone.utc) + timedelta(days=3)).isoformat()
+    first = client.post(
+        "/tasks", json={"title": "First", "due_at": due_at}, headers=auth_headers
+    ).json()
+    second = client.post("/tasks", json={"title": "Second"}, headers=auth_headers).json()
+    client.patch(f"/tasks/{first['id']}", json={"status": "done"}, headers=auth_headers)
+    client.patch(f"/tasks/{second['id']}", json={"due_at": due_at}, headers=auth_headers)
+    client.post("/tasks", json={"title": "Third"}, headers=auth_headers)
+    client.delete(f"/tasks/{second['id']}", headers=auth_headers)
+
+    incremental = _daily_stats(test_db)
+    _rebuild_stats(async_engine)
+    assert _daily_stats(test_db) == incremental
+    assert sum(created for _, created, _, _ in incremental) == 2
+
+
+def test_analytics_summary_cached_until_task_write(client, auth_headers):
+    """Repeat polls hit the cache; task writes invalidate it"""
+    client.post("/tasks", json={"title": "First"}, headers=auth_headers)
+
+    first = client.get("/analytics/summary", headers=auth_headers)
+    second = client.get("/analytics/summary", headers=auth_headers)
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json() == first.json()
+
+    client.post("/tasks", json={"title": "Second"}, headers=auth_headers)
+    third = client.get("/analytics/summary", headers=auth_headers)
+    assert third.headers["X-Cache"] == "MISS"
+    assert third.json()["total_tasks"] == 2
+
+
+def test_analytics_cache_expires_when_a_deadline_becomes_upcoming(client, auth_headers):
+    """A task due just past the 7-day window shows up once it moves into it"""
+    due_at = datetime.now(timezone.utc) + timedelta(days=7, seconds=1)
+    client.post("/tasks", json={"title": "Renew passport", "due_at": due_at.isoformat()}, headers=auth_headers)
+
+    first = client.get("/analytics/summary", headers=auth_headers)
+    assert first.json()["upcoming_deadlines"] == []
+
+    time.sleep(1.2)
+    second = client.get("/analytics/summary", headers=auth_headers)
+    assert second.headers["X-Cache"] == "MISS"
+    assert [task["title"] for task in second.json()["upcoming_deadlines"]] == ["Renew passport"]
+
+
+def test_analytics_cache_sees_writes_from_other_workers(client, auth_headers, test_db):
+    """The version lives in the database, so another process's write invalidates too"""
+    client.post("/tasks", json={"title": "First"}, headers=auth_headers)
+    assert client.get("/analytics/summary", headers=auth_headers).headers["X-Cache"] == "MISS"
+    assert client.get("/analytics/summary", headers=auth_headers).headers["X-Cache"] == "HIT"
+
+    # Another API worker's write: this process's cache is never told
+    test_db.exec(update(User).values(data_version=User.data_version + 1))
+    test_db.commit()
+
+    assert client.get("/analytics/summary", headers=auth_headers).headers["X-Cache"] == "MISS"
+
+
+def _feature_profile(test_db, user_id):
+    test_db.expire_all()
+    profile = test_db.get(UserFeatureProfile, user_id)
+    return (
+        profile.total_tasks,
+        profile.low_count,
+        profile.medium_count,
+        profile.high_count,
+        profile.completion_hours,
+    )
+
+
+def test_feature_profile_maintained_incrementally(
+    client, auth_headers, test_db, test_user, async_engine
+):
+    """Task writes keep the AI feature profile equal to a full rebuild"""
+    due_at = datetime(2030, 1, 1, 9, tzinfo=timezone.utc).isoformat()
+    first = client.post(
+        "/tasks", json={"title": "First", "priority": "high", "due_at": due_at}, headers=auth_headers
+    ).json()
+    second = client.post("/tasks", json={"title": "Second"}, headers=auth_headers).json()
+    client.patch(f"/tasks/{first['id']}", json={"status": "done"}, headers=auth_headers)
+    client.patch(f"/tasks/{second['id']}", json={"priority": "low"}, headers=auth_headers)
+    client.delete(f"/tasks/{second['id']}", headers=auth_headers)
+
+    incremental = _feature_profile(test_db, test_user.id)
+    assert incremental[:4] == (1, 0, 0, 1)
+    assert incremental[4][9] == 1
+
+    async def rebuild():
+        async with AsyncSession(async_engine) as session:
+            await rebuild_feature_profiles(session)
+
+    asyncio.run(rebuild())
+    assert _feature_profile(test_db, test_user.id) == incremental
+
+
+def _train_models(async_engine, priority_model):
+    async def train():
+        async with AsyncSession(async_engine) as session:
+            return await priority_model.train_priority_models(session)
+
+    return asyncio.run(train())
+
+
+def test_priority_model_training_is_incremental(
+    client, test_db, test_user, auth_headers, async_engine, monkeypatch
+):
+    """Trained models drive /ai/suggest and later runs only read new changes"""
+    priority_model = pytest.importorskip("app.services.priority_model")
+    # Requests only use the ML stack once loaded; load it as warmup would
+    assert ai_service.load_ml_backend()
+    monkeypatch.setattr(settings, "MODEL_MIN_TASKS", 10)
+    # The first request loads the model; don't let a slow disk drop it
+    monkeypatch.setattr(settings, "MODEL_INFERENCE_BUDGET_MS", 5000)
+    monkeypatch.setattr(priority_model, "TRAINING_LAG", timedelta(0))
+    for i in range(6):
+        test_db.add(Task(user_id=test_user.id, title=f"File taxes {i}", priority=Priority.HIGH))
+        test_db.add(Task(user_id=test_user.id, title=f"Water plants {i}", priority=Priority.LOW))
+    test_db.commit()
+
+    assert _train_models(async_engine, priority_model)["samples"] == 12
+    assert priority_model.model_path(test_user.id).exists()
+
+    priority_model.model_cache.clear()
+    response = client.post("/ai/suggest", json={"title": "file taxes"}, headers=auth_headers)
+    assert response.json()["suggested_priority"] == "high"
+    assert response.json()["priority_reason"] == "Predicted by a model trained on task history"
+    response = client.post("/ai/suggest", json={"title": "water plants"}, headers=auth_headers)
+    assert response.json()["suggested_priority"] == "low"
+
+    test_db.add(Task(user_id=test_user.id, title="File more taxes", priority=Priority.HIGH))
+    test_db.commit()
+    result = _train_models(async_engine, priority_model)
+    assert result["samples"] == 1
+    assert priority_model.load_model(test_user.id).samples == 13
@@ -0,0 +1,110 @@
+"""Integration tests for pooled SMTP delivery against a local SMTP server"""
+
+import asyncio
+import smtplib
+import time
+from email.mime.text import MIMEText
+
+import pytest
+
+from app.core import email
+from app.core.config import settings
+from app.core.email import SMTPPool
+from tests.smtp_server import DebugSMTPServer
+
+
+@pytest.fixture
+def smtp_server():
+    with DebugSMTPServer() as server:
+        yield server
+
+
+def _pool(server: DebugSMTPServer, **options) -> SMTPPool:
+    return SMTPPool("127.0.0.1", server.port, "user", "secret", starttls=False, **options)
+
+
+def _message(index: int) -> MIMEText:
+    msg = MIMEText(f"Reminder {index}")
+    msg["From"] = "app@example.com"
+    msg["To"] = "user@example.com"
+    msg["Subject"] = f"Reminder {index}"
+    return msg
+
+
+def test_connections_are_reused(smtp_server):
+    """Sequential messages share one logged-in connection"""
+    pool = _pool(smtp_server)
+    for index in range(20):
+        pool.send(_message(index))
+    pool.close()
+
+    assert len(smtp_server.messages) == 20
+    assert smtp_server.connections == 1
+    assert pool.stats()["connections_opened"] == 1
+
+
+def test_message_cap_and_idle_timeout_retire_connections(smtp_server):
+    """A connection is replaced after max_messages, or when idle too long"""
+    pool = _pool(smtp_server, max_messages=10, idle_timeout=0.2)
+    for index in range(25):
+        pool.send(_message(index))
+    assert pool.stats()["connections_opened"] == 3
+
+    time.sleep(0.3)
+    pool.send(_message(25))
+    pool.close()
+    assert pool.stats()["connections_opened"] == 4
+    assert len(smtp_server.messages) == 26
+
+
+def test_dropped_connections_are_reopened():
+    """A send on a connection the server hung up on is retried on a new one"""
+    with DebugSMTPServer(drop_after=5) as server:
+        pool = _pool(server)
+        for index in range(12):
+            pool.send(_message(index))
+        pool.close()
+
+    assert [msg["Subject"] for msg in server.messages] == [f"Reminder {i}" for i in range(12)]
+    assert pool.stats()["reconnects"] == 2
+
+
+def test_refused_recipients_keep_the_connection():
+    """A message the server refuses fails once, without a retry or reconnect"""
+    with DebugSMTPServer(refuse="nobody@") as server:
+        pool = _pool(server)
+        pool.send(_message(0))
+        refused = _message(1)
+        refused.replace_header("To", "nobody@example.com")
+        with pytest.raises(smtplib.SMTPRecipientsRefused):
+            pool.send(refused)
+        pool.send(_message(2))
+        pool.close()
+
+    assert [msg["Subject"] for msg in server.messages] == ["Reminder 0", "Reminder 2"]
+    assert server.connections == 1
+    assert pool.stats()["reconnects"] == 0
+
+
+def test_concurrent_sends_share_pool_connections(smtp_server, monkeypatch):
+    """Concurrent send_email calls share at most SMTP_POOL_SIZE connections"""
+    monkeypatch.setattr(settings, "SMTP_HOST", "127.0.0.1")
+    monkeypatch.setattr(settings, "SMTP_PORT", smtp_server.port)
+    monkeypatch.setattr(settings, "SMTP_USER", "app@example.com")
+    monkeypatch.setattr(settings, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(settings, "SMTP_POOL_SIZE", 4)
+    email.smtp_pool.cache_clear()
+    count = 200
+
+    async def send_all() -> list[bool]:
+        return await asyncio.gather(
+            *(email.send_email("user@example.com", f"Reminder {i}", "<p>Hi</p>") for i in range(count))
+        )
+
+    try:
+        results = asyncio.run(send_all())
+    finally:
+        email.close_smtp_pool()
+
+    assert all(results) and len(smtp_server.messages) == count
+    assert smtp_server.connections <= 4
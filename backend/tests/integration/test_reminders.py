@@ -0,0 +1,516 @@
+"""Integration tests for persistent reminder scheduling and delivery"""
+
+import asyncio
+import base64
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.scheduler import create_scheduler
+from app.core.timers import TimerWheel
+from app.jobs import reminder_job, subscription_job
+from app.models.notification import Notification
+from app.models.push_subscription import PushSubscription
+from app.models.task import Task, Status
+from app.models.user import User
+from app import worker
+from app.schemas.task import TaskUpdate
+from app.services import task_service, web_push
+from tests.push_server import StubPushService
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """Sync engine on a throwaway database, used by the reminder job"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'reminders.db'}")
+    SQLModel.metadata.create_all(engine)
+    monkeypatch.setattr(reminder_job, "engine", engine)
+    return engine
+
+
+@pytest.fixture
+def timers(monkeypatch):
+    """Fresh reminder timer wheel (not ticking), so timers can be inspected"""
+    timers = TimerWheel()
+    monkeypatch.setattr(reminder_job, "reminder_timers", timers)
+    return timers
+
+
+@pytest.fixture
+def channels(monkeypatch):
+    """Record deliveries instead of sending them; every delivery succeeds"""
+    sent = {"push": [], "email": []}
+
+    async def push(subscriptions, notification, feedback=None) -> bool:
+        sent["push"].append(len(subscriptions))
+        return True
+
+    async def email(user, task) -> bool:
+        sent["email"].append(task.id)
+        return True
+
+    monkeypatch.setattr(reminder_job, "send_web_push", push)
+    monkeypatch.setattr(reminder_job, "send_email_notification", email)
+    return sent
+
+
+@pytest.fixture
+def push_service(monkeypatch):
+    """Local push service, with VAPID configured so reminders really push to it"""
+    key = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.DER, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", base64.urlsafe_b64encode(key).decode())
+    web_push.web_push_sender.cache_clear()
+    try:
+        with StubPushService() as service:
+            yield service
+    finally:
+        web_push.web_push_sender.cache_clear()
+
+
+def _push_subscription(user_id: int, endpoint: str) -> PushSubscription:
+    public = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    return PushSubscription(
+        user_id=user_id,
+        endpoint=endpoint,
+        p256dh=base64.urlsafe_b64encode(public).decode(),
+        auth=base64.urlsafe_b64encode(b"0" * 16).decode(),
+    )
+
+
+def _task(engine, **fields) -> Task:
+    with Session(engine) as session:
+        user = session.exec(select(User)).first()
+        if user is None:
+            user = User(email="r@example.com", password_hash="x", name="R")
+            session.add(user)
+            session.commit()
+        task = Task(user_id=user.id, title="Call back", **fields)
+        session.add(task)
+        session.commit()
+        session.refresh(task)
+        return task
+
+
+def _reminder_timers(timers) -> set[str]:
+    return set(timers)
+
+
+def _notifications(engine) -> list[Notification]:
+    with Session(engine) as session:
+        return session.exec(select(Notification)).all()
+
+
+def _send(task_ids: list[int], owner: str = reminder_job.WORKER_ID) -> int:
+    """Run one reminder batch on its own loop, closing the push client opened on it"""
+
+    async def send() -> int:
+        try:
+            return await reminder_job.send_reminder_batch(task_ids, owner)
+        finally:
+            await web_push.close_web_push()
+
+    return asyncio.run(send())
+
+
+def _dispatch(owner: str = reminder_job.WORKER_ID, now=None, limit: int = 1000) -> int:
+    """One worker round: lease due reminders, then run their jobs inline"""
+    claimed = reminder_job.claim_reminders(owner, now or datetime.now(timezone.utc), limit)
+    for task_id, _ in claimed:
+        _send([task_id], owner)
+    return len(claimed)
+
+
+def test_reminder_is_sent_once(engine):
+    """A reminder job that runs twice only notifies once, until remind_at moves"""
+    remind_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    task = _task(engine, remind_at=remind_at)
+
+    assert _dispatch() == 1
+    _send([task.id])
+    assert _dispatch() == 0
+    assert len(_notifications(engine)) == 1
+
+    with Session(engine) as session:
+        stored = session.get(Task, task.id)
+        stored.remind_at = remind_at + timedelta(minutes=10)
+        session.add(stored)
+        session.commit()
+
+    assert _dispatch() == 1
+    assert len(_notifications(engine)) == 2
+
+
+def test_done_or_missing_tasks_are_not_reminded(engine):
+    """Reminders for finished or deleted tasks are dropped"""
+    task = _task(engine, remind_at=datetime.now(timezone.utc), status=Status.DONE)
+
+    assert _dispatch() == 0
+    _send([task.id])
+    _send([task.id + 1])
+    assert _notifications(engine) == []
+
+
+def test_concurrent_workers_send_each_reminder_once(engine):
+    """Workers claiming the same due reminders in parallel never share one"""
+    now = datetime.now(timezone.utc)
+    tasks = [_task(engine, remind_at=now - timedelta(seconds=i)) for i in range(60)]
+    start = threading.Barrier(4)
+    claimed = []
+
+    def worker(owner: str) -> None:
+        start.wait()
+        while count := _dispatch(owner, limit=5):
+            claimed.append(count)
+
+    threads = [threading.Thread(target=worker, args=(f"worker-{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(claimed) == len(tasks)
+    notified = [notification.task_id for notification in _notifications(engine)]
+    assert sorted(notified) == sorted(task.id for task in tasks)
+
+
+def test_expired_lease_is_taken_over(engine):
+    """A dead worker's reminders move to another worker once its lease expires"""
+    task = _task(engine, remind_at=datetime.now(timezone.utc))
+    assert reminder_job.claim_reminders("dead", datetime.now(timezone.utc), 10) != []
+    assert _dispatch("alive") == 0  # still leased
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=settings.REMINDER_LEASE_SECONDS + 1)
+    assert _dispatch("alive", now=later) == 1
+    _send([task.id], "dead")  # the old owner's job wakes up late
+    assert [n.task_id for n in _notifications(engine)] == [task.id]
+
+
+def test_claim_skips_locked_rows_on_postgres():
+    """Postgres claimers skip rows another transaction is leasing"""
+    statement = reminder_job.claim_statement("w", datetime.now(timezone.utc), 10)
+    assert "FOR UPDATE SKIP LOCKED" in str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_sweep_job_survives_restart_and_missed_run_happens(engine, monkeypatch):
+    """The sweep job persists in the database; a run that came due while down happens on start"""
+    monkeypatch.setattr(subscription_job, "engine", engine)
+    monkeypatch.setattr(settings, "PUSH_SUBSCRIPTION_SWEEP_MINUTES", 1 / 60)
+    task = _task(engine)
+    with Session(engine) as session:
+        session.add(PushSubscription(
+            user_id=task.user_id, endpoint="https://push/dead", p256dh="k", auth="a",
+            failure_count=settings.PUSH_SUBSCRIPTION_MAX_FAILURES,
+        ))
+        session.commit()
+
+    scheduler = create_scheduler(engine)
+    scheduler.start(paused=True)
+    subscription_job.schedule_subscription_sweep(scheduler)
+    scheduler.shutdown()
+
+    threading.Event().wait(1.2)  # the next run passes while "down"
+    restarted = create_scheduler(engine)
+    restarted.start(paused=True)
+    try:
+        assert restarted.get_job(subscription_job.SWEEP_JOB_ID) is not None
+        restarted.resume()
+        for _ in range(50):
+            with Session(engine) as session:
+                if session.exec(select(PushSubscription)).first() is None:
+                    break
+            threading.Event().wait(0.1)
+        else:
+            pytest.fail("the missed sweep never ran")
+    finally:
+        restarted.shutdown()
+
+
+def test_window_loader_schedules_near_term_reminders(engine, timers):
+    """Only unsent reminders inside the window (or missed recently) get jobs"""
+    now = datetime.now(timezone.utc)
+    soon = _task(engine, remind_at=now + timedelta(minutes=5))
+    missed = _task(engine, remind_at=now - timedelta(hours=1))
+    _task(engine, remind_at=now + timedelta(days=2))  # beyond the window
+    _task(engine, remind_at=now - timedelta(hours=settings.REMINDER_CATCHUP_HOURS + 1))
+    _task(engine, remind_at=now + timedelta(minutes=5), status=Status.DONE)
+    sent_at = now + timedelta(minutes=6)
+    _task(engine, remind_at=sent_at, reminder_sent_for=sent_at)
+
+    assert asyncio.run(reminder_job.load_reminder_window()) == 2
+    assert _reminder_timers(timers) == {f"reminder:{soon.id}", f"reminder:{missed.id}"}
+    assert asyncio.run(reminder_job.load_reminder_window()) == 0  # nothing moved, no churn
+
+
+def test_edits_move_reminders_in_and_out_of_window(engine, timers):
+    """Writes reschedule inside the window and drop timers that leave it"""
+    now = datetime.now(timezone.utc)
+    task = _task(engine, remind_at=now + timedelta(days=1))
+
+    reminder_job.schedule_reminder(task)
+    assert _reminder_timers(timers) == set()
+
+    task.remind_at = now + timedelta(minutes=10)
+    reminder_job.schedule_reminder(task)
+    assert timers.deadline(f"reminder:{task.id}") == task.remind_at.timestamp()
+
+    task.status = Status.DONE
+    reminder_job.schedule_reminder(task)
+    assert _reminder_timers(timers) == set()
+
+
+def test_worker_drains_and_releases_leases(engine, timers, monkeypatch):
+    """The worker delivers due reminders and hands back the rest on shutdown"""
+    scheduler = create_scheduler(engine)
+    monkeypatch.setattr(worker, "scheduler", scheduler)
+    now = datetime.now(timezone.utc)
+    due = _task(engine, remind_at=now)
+    later = _task(engine, remind_at=now + timedelta(minutes=10))
+
+    async def run_until_notified() -> None:
+        stop = asyncio.Event()
+        serving = asyncio.create_task(worker.run(stop))
+        for _ in range(50):
+            await asyncio.sleep(0.1)
+            if _notifications(engine):
+                break
+        stop.set()
+        await asyncio.wait_for(serving, 5)
+
+    asyncio.run(run_until_notified())
+    assert not scheduler.running and not timers.running
+    assert [n.task_id for n in _notifications(engine)] == [due.id]
+    with Session(engine) as session:
+        assert session.get(Task, later.id).reminder_lease_owner is None
+
+
+def test_api_without_scheduler_leaves_reminders_to_worker(engine, timers, monkeypatch):
+    """With RUN_SCHEDULER off, writes release the lease and schedule nothing"""
+    monkeypatch.setattr(settings, "RUN_SCHEDULER", False)
+    task = _task(engine, remind_at=datetime.now(timezone.utc) + timedelta(minutes=5))
+    task.reminder_lease_owner = "worker"
+
+    reminder_job.lease_for_write(task)
+    reminder_job.schedule_reminder(task)
+    assert task.reminder_lease_owner is None
+    assert _reminder_timers(timers) == set()
+
+
+def test_only_reminder_changes_reschedule(engine, timers, monkeypatch):
+    """Edits that keep remind_at and done-ness don't touch the timer"""
+    rescheduled = []
+    monkeypatch.setattr(task_service, "schedule_reminder", rescheduled.append)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{engine.url.database}")
+    remind_at = datetime.now(timezone.utc) + timedelta(minutes=5)
+    task = _task(engine, remind_at=remind_at)
+
+    async def edit(**fields) -> None:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            stored = await session.get(Task, task.id)
+            await task_service.update_task_with_reminder(session, stored, TaskUpdate(**fields))
+
+    async def edits() -> None:
+        await edit(title="Call back later")
+        await edit(remind_at=remind_at, status=Status.IN_PROGRESS)
+        await edit(remind_at=remind_at + timedelta(minutes=1))
+        await edit(status=Status.DONE)
+        await async_engine.dispose()
+
+    asyncio.run(edits())
+    assert len(rescheduled) == 2
+
+
+def test_batch_sends_each_claimed_reminder_once(engine, channels, monkeypatch):
+    """One batch covers several users and subscriptions, skipping unclaimable tasks"""
+    stats = reminder_job.ReminderStats()
+    monkeypatch.setattr(reminder_job, "reminder_stats", stats)
+    now = datetime.now(timezone.utc)
+    with Session(engine) as session:
+        users = [User(email=f"u{i}@example.com", password_hash="x", name="U") for i in range(2)]
+        session.add_all(users)
+        session.commit()
+        session.add_all([
+            PushSubscription(user_id=users[0].id, endpoint=f"https://push/{i}", p256dh="k", auth="a")
+            for i in range(2)
+        ])
+        tasks = [
+            Task(user_id=users[i % 2].id, title=f"T{i}", remind_at=now, reminder_lease_owner="w")
+            for i in range(4)
+        ]
+        tasks.append(Task(
+            user_id=users[0].id, title="Done", remind_at=now, status=Status.DONE, reminder_lease_owner="w"
+        ))
+        session.add_all(tasks)
+        session.commit()
+        task_ids = [task.id for task in tasks]
+
+    assert _send(task_ids, "w") == 4
+    assert _send(task_ids, "w") == 0
+    notifications = _notifications(engine)
+    assert sorted(n.task_id for n in notifications) == task_ids[:4]
+    assert all(n.delivered_at is not None for n in notifications)
+    assert channels["push"] == [2, 2]  # only users with subscriptions get push
+    assert sorted(channels["email"]) == task_ids[:4]
+    snapshot = stats.snapshot()
+    assert (snapshot["batches"], snapshot["sent"], snapshot["skipped"]) == (2, 4, 6)
+    assert snapshot["largest_batch"] == 5 and snapshot["reminders_per_second"] > 0
+
+
+def test_reminders_firing_together_are_batched(monkeypatch):
+    """Timers firing within the batch window are sent as one batch"""
+    batches = []
+
+    async def send_reminder_batch(task_ids) -> int:
+        batches.append(task_ids)
+        return len(task_ids)
+
+    monkeypatch.setattr(reminder_job, "send_reminder_batch", send_reminder_batch)
+    monkeypatch.setattr(settings, "REMINDER_BATCH_SIZE", 3)
+
+    async def fire() -> None:
+        for task_id in range(5):
+            reminder_job._fire_reminder(task_id)
+        await asyncio.sleep(settings.REMINDER_BATCH_WINDOW_SECONDS + 0.1)
+        await asyncio.gather(*reminder_job._in_flight)
+
+    asyncio.run(fire())
+    assert batches == [[0, 1, 2], [3, 4]]
+
+
+@pytest.mark.parametrize("batch_size", [1, 25])
+def test_reminder_round_trips_do_not_grow_with_batch(engine, channels, batch_size):
+    """Claim, one joined load and one notification insert, however many reminders"""
+    now = datetime.now(timezone.utc)
+    task_ids = [
+        _task(engine, remind_at=now, reminder_lease_owner="w").id for _ in range(batch_size)
+    ]
+    statements = []
+
+    def listener(conn, cursor, statement, *args) -> None:
+        statements.append(statement.split()[0])
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert _send(task_ids, "w") == batch_size
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    assert statements == ["UPDATE", "SELECT", "INSERT"]
+    assert len(_notifications(engine)) == batch_size
+    assert all(n.delivered_at is not None for n in _notifications(engine))
+
+
+def test_no_connection_is_held_while_delivering(engine, monkeypatch):
+    """The claim session is closed before delivery; the insert opens its own"""
+    held = []
+
+    async def email(user, task) -> bool:
+        held.append(engine.pool.checkedout())
+        await asyncio.sleep(0.01)
+        return True
+
+    monkeypatch.setattr(reminder_job, "send_email_notification", email)
+    task = _task(engine, remind_at=datetime.now(timezone.utc), reminder_lease_owner="w")
+
+    assert _send([task.id], "w") == 1
+    assert held == [0]
+    assert _notifications(engine)[0].delivered_at is not None
+
+
+def test_batch_pushes_to_subscriptions(engine, push_service):
+    """Every reminder of a user with a subscription reaches the push service"""
+    now = datetime.now(timezone.utc)
+    tasks = [_task(engine, remind_at=now, reminder_lease_owner="w") for _ in range(3)]
+    with Session(engine) as session:
+        session.add(_push_subscription(tasks[0].user_id, push_service.endpoint("push/1")))
+        session.commit()
+
+    assert _send([task.id for task in tasks], "w") == 3
+    assert len(push_service.requests) == 3
+
+
+def test_subscriptions_with_broken_keys_are_deleted(engine, push_service):
+    """A subscription that can't be encrypted to is dropped; the user's others still get the push"""
+    task = _task(engine, remind_at=datetime.now(timezone.utc), reminder_lease_owner="w")
+    with Session(engine) as session:
+        broken = _push_subscription(task.user_id, push_service.endpoint("push/broken"))
+        broken.p256dh = "abc"
+        session.add_all([broken, _push_subscription(task.user_id, push_service.endpoint("push/ok"))])
+        session.commit()
+
+    assert _send([task.id], "w") == 1
+    assert [request.path for request in push_service.requests] == ["/push/ok"]
+    assert _notifications(engine)[0].delivered_at is not None
+    with Session(engine) as session:
+        assert [s.endpoint for s in session.exec(select(PushSubscription))] == [push_service.endpoint("push/ok")]
+
+
+def test_undelivered_reminders_are_recorded_without_delivered_at(engine):
+    """With no push subscription and SMTP unconfigured nothing is delivered"""
+    task = _task(engine, remind_at=datetime.now(timezone.utc), reminder_lease_owner="w")
+
+    assert _send([task.id], "w") == 1
+    [notification] = _notifications(engine)
+    assert notification.delivered_at is None
+
+
+def test_push_outcomes_prune_subscriptions(engine, monkeypatch):
+    """Gone subscriptions are deleted and failures counted, in the batch's transaction"""
+    monkeypatch.setattr(settings, "PUSH_SUBSCRIPTION_MAX_FAILURES", 3)
+    statuses = {"gone": 410, "missing": 404, "failing": 500, "recovered": 201, "ok": 201, "throttled": 429}
+    pushed = []
+
+    async def push(subscriptions, notification, feedback=None) -> bool:
+        pushed.extend(subscription.endpoint for subscription in subscriptions)
+        feedback.record(subscriptions, [statuses[s.endpoint] for s in subscriptions])
+        return True
+
+    monkeypatch.setattr(reminder_job, "send_web_push", push)
+    now = datetime.now(timezone.utc)
+    task = _task(engine, remind_at=now, reminder_lease_owner="w")
+    failures = {"failing": 1, "recovered": 2, "throttled": 1, "dead": 3}
+    with Session(engine) as session:
+        session.add_all([
+            PushSubscription(
+                user_id=task.user_id, endpoint=endpoint, p256dh="k", auth="a",
+                failure_count=failures.get(endpoint, 0),
+            )
+            for endpoint in [*statuses, "dead"]
+        ])
+        session.commit()
+
+    assert _send([task.id], "w") == 1
+    assert "dead" not in pushed  # over the threshold, no longer pushed to
+    with Session(engine) as session:
+        remaining = {s.endpoint: s.failure_count for s in session.exec(select(PushSubscription))}
+    assert remaining == {"failing": 2, "recovered": 0, "ok": 0, "throttled": 1, "dead": 3}
+
+    monkeypatch.setattr(subscription_job, "engine", engine)
+    assert subscription_job.sweep_push_subscriptions() == 1
+    with Session(engine) as session:
+        assert "dead" not in {s.endpoint for s in session.exec(select(PushSubscription))}
+
+
+def test_subscription_sweep_is_one_persisted_job(engine):
+    """Registering the sweep again (every start) replaces the stored job"""
+    scheduler = create_scheduler(engine)
+    scheduler.start(paused=True)
+    try:
+        subscription_job.schedule_subscription_sweep(scheduler)
+        subscription_job.schedule_subscription_sweep(scheduler)
+        [job] = scheduler.get_jobs()
+        assert job.id == subscription_job.SWEEP_JOB_ID
+        assert job.trigger.interval == timedelta(minutes=settings.PUSH_SUBSCRIPTION_SWEEP_MINUTES)
+    finally:
+        scheduler.shutdown()
@@ -0,0 +1,159 @@
+"""Integration tests for Web Push delivery against a local push service"""
+
+import asyncio
+import base64
+import json
+import os
+import time
+
+import http_ece
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.core.config import settings
+from app.models.notification import Notification
+from app.models.push_subscription import PushSubscription
+from app.services import web_push
+from app.services.notification_service import send_web_push
+from app.services.web_push import INVALID_KEYS, TRANSPORT_ERROR, WebPushSender
+from tests.push_server import StubPushService
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _vapid_private_key() -> str:
+    key = ec.generate_private_key(ec.SECP256R1())
+    return _b64(key.private_bytes(
+        serialization.Encoding.DER, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+
+
+@pytest.fixture
+def push_service():
+    with StubPushService() as service:
+        yield service
+
+
+@pytest.fixture
+def subscriber():
+    """A browser-side key pair and auth secret, to decrypt what was pushed"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    public = key.public_key().public_bytes(
+        serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint
+    )
+    return key, _b64(public), os.urandom(16)
+
+
+def _subscriptions(service: StubPushService, subscriber, count: int) -> list[PushSubscription]:
+    _, p256dh, auth = subscriber
+    return [
+        PushSubscription(user_id=1, endpoint=service.endpoint(f"push/{i}"), p256dh=p256dh, auth=_b64(auth))
+        for i in range(count)
+    ]
+
+
+def _decrypt(body: bytes, subscriber) -> dict:
+    key, _, auth = subscriber
+    return json.loads(http_ece.decrypt(body, private_key=key, auth_secret=auth, version="aes128gcm"))
+
+
+def test_send_web_push_delivers_encrypted_payload(push_service, subscriber, monkeypatch):
+    """The push service receives an aes128gcm message the subscriber can read"""
+    monkeypatch.setattr(settings, "VAPID_PRIVATE_KEY", _vapid_private_key())
+    web_push.web_push_sender.cache_clear()
+    notification = Notification(user_id=1, payload_json={"title": "Reminder: Ship it", "task_id": 7})
+
+    async def main() -> bool:
+        try:
+            return await send_web_push(_subscriptions(push_service, subscriber, 2), notification)
+        finally:
+            await web_push.close_web_push()
+
+    try:
+        assert asyncio.run(main()) is True
+    finally:
+        web_push.web_push_sender.cache_clear()
+
+    assert len(push_service.requests) == 2
+    request = push_service.requests[0]
+    assert request.headers["Content-Encoding"] == "aes128gcm"
+    assert request.headers["TTL"] == str(settings.WEB_PUSH_TTL_SECONDS)
+    assert request.headers["Authorization"].startswith("vapid t=")
+    assert _decrypt(request.body, subscriber) == {"title": "Reminder: Ship it", "task_id": 7}
+
+
+def test_vapid_header_is_signed_once_per_push_service(monkeypatch):
+    """Signing happens per audience, and again only close to expiry"""
+    sender = WebPushSender(_vapid_private_key(), "mailto:admin@example.com")
+    signed = []
+    sign = sender.vapid.sign
+    monkeypatch.setattr(sender.vapid, "sign", lambda claims: signed.append(claims["aud"]) or sign(claims))
+
+    first = sender.vapid_headers("https://fcm.googleapis.com/fcm/send/a")
+    assert sender.vapid_headers("https://fcm.googleapis.com/fcm/send/b") is first
+    sender.vapid_headers("https://updates.push.services.mozilla.com/wpush/v2/c")
+    assert signed == ["https://fcm.googleapis.com", "https://updates.push.services.mozilla.com"]
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + web_push.VAPID_TOKEN_LIFETIME)
+    assert sender.vapid_headers("https://fcm.googleapis.com/fcm/send/a") is not first
+    assert len(signed) == 3
+
+
+def test_statuses_are_reported_per_subscription(push_service, subscriber):
+    """Rejections and unreachable push services come back as statuses, not errors"""
+    push_service.statuses["/push/1"] = 410
+    subscriptions = _subscriptions(push_service, subscriber, 2)
+    subscriptions.append(PushSubscription(
+        user_id=1, endpoint="http://127.0.0.1:9/push/closed", p256dh=subscriptions[0].p256dh, auth=subscriptions[0].auth
+    ))
+    sender = WebPushSender(_vapid_private_key(), "mailto:admin@example.com", timeout=2.0)
+
+    async def main() -> list[int]:
+        try:
+            return await sender.send_all(subscriptions, '{"title": "Hi"}')
+        finally:
+            await sender.aclose()
+
+    assert asyncio.run(main()) == [201, 410, TRANSPORT_ERROR]
+
+
+def test_broken_keys_fail_only_their_subscription(push_service, subscriber):
+    """A subscription the message can't be encrypted to doesn't stop the others"""
+    subscriptions = _subscriptions(push_service, subscriber, 3)
+    subscriptions[0].p256dh = ""
+    subscriptions[1].auth = "x"
+    sender = WebPushSender(_vapid_private_key(), "mailto:admin@example.com")
+
+    async def main() -> list[int]:
+        try:
+            return await sender.send_all(subscriptions, '{"title": "Hi"}')
+        finally:
+            await sender.aclose()
+
+    assert asyncio.run(main()) == [INVALID_KEYS, INVALID_KEYS, 201]
+    assert [request.path for request in push_service.requests] == ["/push/2"]
+
+
+def test_fan_out_reuses_connections(push_service, subscriber):
+    """Concurrent sends share at most max_connections keep-alive connections"""
+    count = 300
+    subscriptions = _subscriptions(push_service, subscriber, count)
+    sender = WebPushSender(_vapid_private_key(), "mailto:admin@example.com", max_connections=10)
+
+    async def main() -> list[int]:
+        try:
+            # Two rounds: the second must run over the first round's connections
+            first = await sender.send_all(subscriptions[: count // 2], '{"title": "Hi"}')
+            return first + await sender.send_all(subscriptions[count // 2 :], '{"title": "Hi"}')
+        finally:
+            await sender.aclose()
+
+    statuses = asyncio.run(main())
+
+    assert statuses == [201] * count
+    assert len(push_service.requests) == count
+    assert push_service.connections <= 10
@@ -0,0 +1,62 @@
+"""Local stub push service for Web Push tests and load measurements"""
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+
+
+class PushRequest(NamedTuple):
+    path: str
+    headers: dict[str, str]
+    body: bytes
+    client: tuple[str, int]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+    server: "StubPushService"
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests.append(
+                PushRequest(self.path, dict(self.headers), body, self.client_address)
+            )
+        status = self.server.statuses.get(self.path, 201)
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+class StubPushService(ThreadingHTTPServer):
+    """
+    Accepts Web Push POSTs on any path, answering 201 Created
+    `statuses` maps paths to other responses (e.g. 410 for an expired
+    subscription); every request is kept for inspection.
+    """
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.requests: list[PushRequest] = []
+        self.statuses: dict[str, int] = {}
+
+    def endpoint(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{path}"
+
+    @property
+    def connections(self) -> int:
+        return len({request.client for request in self.requests})
+
+    def __enter__(self) -> "StubPushService":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,75 @@
+"""Minimal local SMTP server for email tests and throughput measurements"""
+
+import socketserver
+import threading
+from email import message_from_bytes
+from email.message import Message
+from typing import Optional
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DebugSMTPServer"
+
+    def _reply(self, *lines: str) -> None:
+        self.wfile.write("".join(f"{line}\r\n" for line in lines).encode())
+
+    def handle(self) -> None:
+        with self.server.lock:
+            self.server.connections += 1
+        received = 0
+        self._reply("220 localhost test SMTP")
+        while line := self.rfile.readline():
+            verb = line.decode().split(" ", 1)[0].strip().upper()
+            if verb == "EHLO":
+                self._reply("250-localhost", "250-AUTH PLAIN LOGIN", "250 8BITMIME")
+            elif verb == "AUTH":
+                self._reply("235 Authenticated")
+            elif verb == "RCPT" and self.server.refuse and self.server.refuse in line.decode():
+                self._reply("550 No such user")
+            elif verb in ("HELO", "MAIL", "RCPT", "RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = b"".join(iter(lambda: self.rfile.readline(), b".\r\n"))
+                with self.server.lock:
+                    self.server.messages.append(message_from_bytes(data))
+                self._reply("250 Queued")
+                received += 1
+                if self.server.drop_after and received >= self.server.drop_after:
+                    return  # Hang up without QUIT, like a server timing out
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class DebugSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Accepts any login and message, keeping messages in memory
+    `drop_after` makes it hang up after that many messages per connection;
+    recipients containing `refuse` are rejected.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_after: Optional[int] = None, refuse: Optional[str] = None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.lock = threading.Lock()
+        self.messages: list[Message] = []
+        self.connections = 0
+        self.drop_after = drop_after
+        self.refuse = refuse
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self) -> "DebugSMTPServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+        self.server_close()
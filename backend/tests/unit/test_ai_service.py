@@ -0,0 +1,165 @@
+"""Unit tests for the AI suggestion heuristics"""
+
+import asyncio
+import subprocess
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from app.models.task import Priority
+from app.models.user_feature_profile import UserFeatureProfile
+from app.services import ai_service
+from app.services.free_slots import BusyIntervals
+from app.services.ai_service import (
+    load_ml_backend,
+    _model_priorities,
+    _slot_confidences,
+    _suggest_priorities,
+    _suggest_priority,
+    _suggest_time_slots,
+)
+
+
+def _profile(**counts) -> UserFeatureProfile:
+    profile = UserFeatureProfile(user_id=1, **counts)
+    profile.total_tasks = profile.low_count + profile.medium_count + profile.high_count
+    return profile
+
+
+def test_priority_from_urgency_keywords():
+    """Urgency keywords raise priority for new users"""
+    priority, _ = _suggest_priority({"title": "URGENT: fix login"}, _profile())
+    assert priority == "high"
+
+    priority, _ = _suggest_priority({"title": "Water plants"}, _profile())
+    assert priority == "medium"
+
+
+def test_priority_from_history():
+    """The user's historical priority mix drives the default"""
+    assert _suggest_priority({"title": "a"}, _profile(high_count=4, low_count=6))[0] == "high"
+    assert _suggest_priority({"title": "a"}, _profile(high_count=2, low_count=8))[0] == "medium"
+    assert _suggest_priority({"title": "a"}, _profile(low_count=10))[0] == "low"
+
+
+def test_time_slots_avoid_busy_periods():
+    """Slots last the estimated duration and skip hours already taken by tasks"""
+    hours = [0] * 24
+    hours[9] = 3
+    now = datetime(2024, 1, 15, 6, 30, tzinfo=timezone.utc)
+    first_nine = datetime(2024, 1, 15, 9, tzinfo=timezone.utc)
+    busy = BusyIntervals([(first_nine - timedelta(minutes=30), first_nine + timedelta(minutes=45))])
+
+    slots, reasoning = _suggest_time_slots(
+        1, _profile(completion_hours=hours), {"estimated_duration_minutes": 90}, busy, now
+    )
+
+    assert [slot["start"] for slot in slots] == [
+        "2024-01-16T09:00:00+00:00",
+        "2024-01-17T09:00:00+00:00",
+    ]
+    assert slots[0]["end"] == "2024-01-16T10:30:00+00:00"
+    assert "avoiding 1 busy periods" in reasoning
+
+
+def test_time_slots_follow_completion_hours():
+    """Suggested slots land on the user's most common completion hours"""
+    hours = [0] * 24
+    hours[9] = 3
+    hours[15] = 1
+    slots, _ = _suggest_time_slots(1, _profile(completion_hours=hours))
+
+    assert len(slots) == 2
+    assert {slot["start"][11:13] for slot in slots} <= {"09", "15"}
+    assert max(slot["confidence"] for slot in slots) == 0.75
+
+
+BATCH_CONTEXTS = [None, {"title": "URGENT"}, {"description": "prep deadline"}, {"title": "a"}, {}]
+
+
+@pytest.mark.parametrize(
+    "counts", [{}, {"high_count": 4, "low_count": 6}, {"high_count": 2, "low_count": 8}, {"low_count": 10}]
+)
+def test_batch_priorities_match_single(counts, monkeypatch):
+    """Without the ML stack the batch scorer agrees with the per-task heuristic"""
+    monkeypatch.setattr(ai_service, "ML_AVAILABLE", False)
+    profile = _profile(**counts)
+
+    expected = [_suggest_priority(context, profile) for context in BATCH_CONTEXTS]
+    assert _suggest_priorities(BATCH_CONTEXTS, profile) == expected
+
+
+def test_batch_priorities_use_one_model_call(monkeypatch):
+    """With a model, every text in the batch is scored in a single call"""
+    pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    assert load_ml_backend()
+    calls = []
+
+    async def predict_priorities(user_id, texts):
+        calls.append(texts)
+        return [Priority.LOW] * len(texts)
+
+    monkeypatch.setattr(ai_service.priority_model, "predict_priorities", predict_priorities)
+    profile = _profile()
+    predicted = asyncio.run(_model_priorities(BATCH_CONTEXTS, profile))
+    suggestions = _suggest_priorities(BATCH_CONTEXTS, profile, predicted)
+
+    assert len(calls) == 1 and len(calls[0]) == len(BATCH_CONTEXTS)
+    assert [priority for priority, _ in suggestions] == ["medium", "low", "low", "low", "medium"]
+
+
+def test_requests_never_wait_for_the_ml_stack(monkeypatch):
+    """On the event loop an unloaded ML stack means heuristics now, a load in the background"""
+    pytest.importorskip("numpy")
+    pytest.importorskip("sklearn")
+    monkeypatch.setattr(ai_service, "priority_model", None)
+    monkeypatch.setattr(ai_service, "_ml_loading", None)
+
+    async def main():
+        predicted = await _model_priorities(BATCH_CONTEXTS, _profile())
+        assert ai_service._ml_loading is not None
+        await ai_service._ml_loading
+        return predicted
+
+    assert asyncio.run(main()) is None
+    assert ai_service.priority_model is not None
+
+
+def test_slot_confidences_reuse_the_hour_table():
+    """The 72 slots rotate one cached table per completion histogram"""
+    hours = [0] * 24
+    hours[9] = 3
+    hours[15] = 1
+    hours[20] = 1
+    profile = _profile(completion_hours=hours)
+    start = datetime(2024, 1, 15, 11, tzinfo=timezone.utc)
+    ai_service.hour_confidence_cache.clear()
+
+    confidences = _slot_confidences(profile, start)
+    assert len(confidences) == 72
+    assert confidences[22] == 0.6  # 09:00 next day
+    assert confidences[4] == 0.2  # 15:00 today
+    assert confidences[9] == 0.0  # 20:00 isn't a top-2 hour
+
+    hits = ai_service.hour_confidence_cache.hits
+    assert _slot_confidences(_profile(completion_hours=list(hours)), start) == confidences
+    assert ai_service.hour_confidence_cache.hits == hits + 1
+
+    hours[20] = 5  # a completed task moves the preferred hours
+    assert _slot_confidences(_profile(completion_hours=hours), start)[9] == 5 / 9
+
+
+def test_app_import_defers_ml_stack():
+    """Importing the app (every worker's cold start) doesn't pull in numpy/sklearn"""
+    code = "import sys, app.main; print(sorted({'numpy', 'sklearn'} & set(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
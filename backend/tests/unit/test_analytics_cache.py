@@ -0,0 +1,43 @@
+"""Unit tests for the analytics response cache"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.services.analytics_cache import UPCOMING_WINDOW, cache_summary, get_cached_summary
+
+
+def _summary(upcoming_due_at=None):
+    upcoming = [{"id": 1, "title": "t", "due_at": upcoming_due_at, "priority": "low"}]
+    return {"upcoming_deadlines": upcoming if upcoming_due_at else []}
+
+
+def test_entries_are_keyed_by_data_version():
+    """A summary cached at one data version is not served at the next"""
+    user_id = 1001
+    cache_summary(user_id, 3, _summary(), datetime.now(timezone.utc))
+    assert get_cached_summary(user_id, 3) is not None
+    assert get_cached_summary(user_id, 4) is None
+
+
+def test_entry_expires_when_next_deadline_passes():
+    """Upcoming deadlines cap the TTL so overdue counts stay correct"""
+    user_id = 1002
+    now = datetime.now(timezone.utc)
+    due_at = (now + timedelta(milliseconds=50)).isoformat()
+    cache_summary(user_id, 0, _summary(due_at), now)
+    assert get_cached_summary(user_id, 0) is not None
+
+    time.sleep(0.1)
+    assert get_cached_summary(user_id, 0) is None
+
+
+def test_entry_expires_when_a_deadline_enters_the_upcoming_window():
+    """A deadline just beyond the window caps the TTL so it gets listed on time"""
+    user_id = 1003
+    now = datetime.now(timezone.utc)
+    enters_window_at = now + UPCOMING_WINDOW + timedelta(milliseconds=50)
+    cache_summary(user_id, 0, _summary(), now, enters_window_at)
+    assert get_cached_summary(user_id, 0) is not None
+
+    time.sleep(0.1)
+    assert get_cached_summary(user_id, 0) is None
@@ -1,7 +1,19 @@
 """Unit tests for authentication"""
 
+import asyncio
+import threading
+
 import pytest
-from app.core.security import get_password_hash, verify_password, create_access_token, decode_token
+from app.core.security import (
+    PasswordHasher,
+    PasswordHasherBusyError,
+    get_password_hash,
+    get_password_hash_async,
+    verify_password,
+    verify_password_async,
+    create_access_token,
+    decode_token,
+)
 
 
 def test_password_hashing():
@@ -27,3 +39,31 @@ def test_jwt_token_creation():
     assert decoded["sub"] == "1"
     assert decoded["email"] == "test@example.com"
 
+
+
+@pytest.mark.asyncio
+async def test_async_password_hashing():
+    """Async wrappers hash and verify on the worker pool"""
+    hashed = await get_password_hash_async("test_password_123")
+
+    assert await verify_password_async("test_password_123", hashed)
+    assert not await verify_password_async("wrong_password", hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_rejects_when_saturated():
+    """Calls beyond workers + queue limit are rejected instead of queued"""
+    hasher = PasswordHasher(workers=1, queue_limit=1)
+    release = threading.Event()
+
+    running = [asyncio.create_task(hasher.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    assert hasher.pending == 2
+
+    with pytest.raises(PasswordHasherBusyError):
+        await hasher.run(release.wait)
+
+    release.set()
+    await asyncio.gather(*running)
+    assert hasher.pending == 0
+    hasher.shutdown()
@@ -0,0 +1,45 @@
+"""Unit tests for the in-process TTL cache"""
+
+import time
+
+from app.core.cache import TTLCache
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted first"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_expiry_and_counters():
+    """Expired entries count as misses"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("short", "value", ttl=0.01)
+    assert cache.get("short") == "value"
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_invalidate_where():
+    """Predicate invalidation drops only matching entries"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("t1", 1)
+    cache.set("t2", 2)
+    cache.set("t3", 1)
+
+    assert cache.invalidate_where(lambda _key, value: value == 1) == 2
+    assert cache.get("t2") == 2
+    assert len(cache) == 1
@@ -0,0 +1,103 @@
+"""Unit tests for the notification delivery queue"""
+
+import asyncio
+
+import pytest
+
+from app.models.notification import Channel
+from app.services.delivery_queue import DeliveryQueue
+
+
+def test_channel_concurrency_is_bounded():
+    """No more than the channel's limit of deliveries run at once"""
+    running = {Channel.EMAIL: 0, Channel.WEB_PUSH: 0}
+    peak = dict(running)
+
+    def deliverer(channel: Channel):
+        async def deliver(item: int) -> bool:
+            running[channel] += 1
+            peak[channel] = max(peak[channel], running[channel])
+            await asyncio.sleep(0.01)
+            running[channel] -= 1
+            return item % 2 == 0
+
+        return deliver
+
+    async def main() -> list[bool]:
+        queue = DeliveryQueue({Channel.EMAIL: 2, Channel.WEB_PUSH: 5}, maxsize=4)
+        queue.start()
+        results = await asyncio.gather(
+            *(queue.deliver(Channel.EMAIL, deliverer(Channel.EMAIL), i) for i in range(10)),
+            *(queue.deliver(Channel.WEB_PUSH, deliverer(Channel.WEB_PUSH), i) for i in range(20)),
+        )
+        await queue.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert results == [i % 2 == 0 for i in range(10)] + [i % 2 == 0 for i in range(20)]
+    assert peak == {Channel.EMAIL: 2, Channel.WEB_PUSH: 5}
+
+
+def test_full_buffer_holds_producers_back():
+    """A producer putting into a full channel waits until a slot frees up"""
+    submitted = []
+
+    async def main() -> None:
+        release = asyncio.Event()
+
+        async def deliver(item: int) -> bool:
+            await release.wait()
+            return True
+
+        queue = DeliveryQueue({Channel.EMAIL: 1}, maxsize=1)
+        queue.start()
+
+        async def producer() -> None:
+            for item in range(4):
+                await queue.put(Channel.EMAIL, deliver, item)
+                submitted.append(item)
+
+        producing = asyncio.create_task(producer())
+        await asyncio.sleep(0.1)
+        # One delivery running, one buffered, the third put is waiting
+        assert submitted == [0, 1]
+        release.set()
+        await asyncio.wait_for(producing, 5)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert submitted == [0, 1, 2, 3]
+
+
+def test_stop_finishes_queued_deliveries_and_errors_reach_the_caller():
+    """Stopping drains the buffer; a failing delivery fails its own future only"""
+    delivered = []
+
+    async def deliver(item: int) -> bool:
+        if item == 3:
+            raise RuntimeError("SMTP down")
+        delivered.append(item)
+        return True
+
+    async def main() -> list:
+        queue = DeliveryQueue({Channel.EMAIL: 1}, maxsize=10)
+        queue.start()
+        futures = [await queue.put(Channel.EMAIL, deliver, item) for item in range(5)]
+        await queue.stop()
+        assert not queue.running
+        return futures
+
+    futures = asyncio.run(main())
+    assert delivered == [0, 1, 2, 4]
+    with pytest.raises(RuntimeError):
+        futures[3].result()
+
+
+def test_deliver_without_running_queue_delivers_inline():
+    """Scripts without a started queue still deliver, on their own loop"""
+
+    async def deliver(item: int) -> bool:
+        return item == 1
+
+    queue = DeliveryQueue({Channel.EMAIL: 1}, maxsize=1)
+    assert asyncio.run(queue.deliver(Channel.EMAIL, deliver, 1)) is True
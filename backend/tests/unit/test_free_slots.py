@@ -0,0 +1,34 @@
+"""Unit tests for the busy-interval index"""
+
+from datetime import datetime, timedelta, timezone
+
+from app.services.free_slots import BusyIntervals
+
+T0 = datetime(2024, 1, 15, 9, tzinfo=timezone.utc)
+
+
+def _at(hours: float) -> datetime:
+    return T0 + timedelta(hours=hours)
+
+
+def test_intervals_are_merged():
+    """Overlapping and touching intervals collapse into one"""
+    busy = BusyIntervals([(_at(3), _at(4)), (_at(0), _at(1)), (_at(0.5), _at(2)), (_at(2), _at(2.5))])
+
+    assert len(busy) == 2
+    assert busy.starts == [_at(0), _at(3)]
+    assert busy.ends == [_at(2.5), _at(4)]
+
+
+def test_overlaps_and_next_free():
+    """Conflicts are half-open; next_free skips over chains of busy intervals"""
+    busy = BusyIntervals([(_at(1), _at(2)), (_at(2.5), _at(3)), (_at(5), _at(6))])
+    hour = timedelta(hours=1)
+
+    assert not busy.overlaps(_at(0), _at(1))
+    assert busy.overlaps(_at(0.5), _at(1.5))
+    assert not busy.overlaps(_at(3), _at(4))
+    assert busy.next_free(_at(0), hour) == _at(0)
+    assert busy.next_free(_at(0.5), hour) == _at(3)  # the 30 min gap at 2:00 is too short
+    assert busy.next_free(_at(4.5), hour) == _at(6)
+    assert BusyIntervals([]).next_free(_at(1), hour) == _at(1)
@@ -0,0 +1,81 @@
+"""Unit tests for the priority model store and inference fallback"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.task import Priority
+
+pytest.importorskip("sklearn")
+
+from app.services import priority_model  # noqa: E402
+from app.services.priority_model import _fit, load_model, predict_priorities, save_model  # noqa: E402
+
+TEXTS = ["file taxes", "pay taxes", "water plants", "buy plants"]
+LABELS = ["high", "high", "low", "low"]
+
+
+def test_store_roundtrip_and_incremental_fit(model_store):
+    """Saved models load back and keep training from where they stopped"""
+    watermark = datetime(2024, 1, 15, tzinfo=timezone.utc)
+    model = _fit(None, TEXTS, LABELS)._replace(trained_through=watermark)
+    save_model(7, model)
+
+    loaded = load_model(7)
+    assert loaded.samples == 4
+    assert loaded.trained_through == watermark
+    assert loaded.coef.shape == model.coef.shape
+    assert load_model(8) is None
+
+    assert _fit(loaded, TEXTS[:1], LABELS[:1]).samples == 5
+
+
+def _predict(user_id, texts):
+    return asyncio.run(predict_priorities(user_id, texts))
+
+
+def test_predict_uses_user_then_global_model(model_store, monkeypatch):
+    """Inference prefers the user's model, then the global one, else None"""
+    monkeypatch.setattr(settings, "MODEL_MIN_TASKS", 4)
+    assert _predict(7, ["file taxes"]) is None
+
+    save_model(None, _fit(None, TEXTS, LABELS))  # drops the cached miss
+    assert _predict(7, ["file taxes", "water plants"]) == [Priority.HIGH, Priority.LOW]
+
+
+def test_predict_falls_back_when_over_budget(model_store, monkeypatch):
+    """A model that isn't loaded within the latency budget is skipped, then served from cache"""
+    monkeypatch.setattr(settings, "MODEL_MIN_TASKS", 4)
+    monkeypatch.setattr(settings, "MODEL_INFERENCE_BUDGET_MS", 0)
+    save_model(None, _fit(None, TEXTS, LABELS))
+    exceeded = priority_model.budget_exceeded
+
+    assert _predict(7, ["file taxes"]) is None
+    assert priority_model.budget_exceeded == exceeded + 1
+
+    # The loads (the user's missing model and the global one) kept going off
+    # the event loop and filled the cache
+    for _ in range(100):
+        if all(priority_model.model_cache.get(owner) is not None for owner in (7, None)):
+            break
+        time.sleep(0.01)
+    assert _predict(7, ["file taxes"]) == [Priority.HIGH]
+
+
+def test_missing_models_are_rechecked_soon(model_store, monkeypatch):
+    """A cached miss expires after MODEL_MISS_CACHE_TTL_SECONDS, not the model TTL"""
+    monkeypatch.setattr(settings, "MODEL_MIN_TASKS", 4)
+    monkeypatch.setattr(settings, "MODEL_MISS_CACHE_TTL_SECONDS", 0.05)
+    assert _predict(7, ["file taxes"]) is None
+
+    # Written by another process (the nightly trainer): no invalidation here
+    model = _fit(None, TEXTS, LABELS)
+    monkeypatch.setattr(priority_model.model_cache, "invalidate", lambda key: None)
+    save_model(7, model)
+    assert _predict(7, ["file taxes"]) is None
+
+    time.sleep(0.1)
+    assert _predict(7, ["file taxes"]) == [Priority.HIGH]
@@ -0,0 +1,99 @@
+"""Unit tests for the timer wheel"""
+
+import asyncio
+import time
+
+from app.core.timers import TimerWheel
+
+
+def _wheel(slots: int = 8) -> tuple[TimerWheel, float]:
+    """Wheel with 1s ticks and the current tick's start time"""
+    wheel = TimerWheel(tick=1.0, slots=slots)
+    return wheel, float(wheel._current)
+
+
+def test_timers_fire_once_when_due():
+    """Only due timers fire, each once; past deadlines fire on the next tick"""
+    fired = []
+    wheel, now = _wheel()
+    wheel.schedule("a", now + 3, fired.append, "a")
+    wheel.schedule("b", now + 5, fired.append, "b")
+    wheel.schedule("late", now - 60, fired.append, "late")
+
+    assert wheel.advance(now + 1) == 1
+    assert wheel.advance(now + 3.5) == 1
+    assert fired == ["late", "a"]
+    assert list(wheel) == ["b"]
+    assert wheel.advance(now + 3.9) == 0
+
+
+def test_cancel_and_reschedule():
+    """Rescheduling replaces the timer under its key; cancelled timers never fire"""
+    fired = []
+    wheel, now = _wheel()
+    wheel.schedule("a", now + 2, fired.append, "first")
+    wheel.schedule("a", now + 4, fired.append, "second")
+    wheel.schedule("b", now + 2, fired.append, "b")
+
+    assert wheel.cancel("b") and not wheel.cancel("b")
+    assert len(wheel) == 1 and wheel.deadline("a") == now + 4
+    wheel.advance(now + 10)
+    assert fired == ["second"]
+
+
+def test_timers_beyond_one_revolution_wait_their_round():
+    """A timer sharing a slot with an earlier tick stays until its own round"""
+    fired = []
+    wheel, now = _wheel(slots=8)
+    wheel.schedule("far", now + 8 + 2, fired.append, "far")
+    wheel.schedule("near", now + 2, fired.append, "near")
+
+    for second in range(1, 9):
+        wheel.advance(now + second)
+    assert fired == ["near"]
+    wheel.advance(now + 10)
+    assert fired == ["near", "far"]
+
+
+def test_stall_longer_than_a_revolution_fires_everything_due():
+    """After the loop was blocked for several revolutions nothing due is lost"""
+    fired = []
+    wheel, now = _wheel(slots=8)
+    for offset in range(1, 30):
+        wheel.schedule(str(offset), now + offset, fired.append, offset)
+
+    assert wheel.advance(now + 25) == 25
+    assert sorted(fired) == list(range(1, 26))
+
+
+def test_callbacks_can_reschedule():
+    """A timer scheduled from a callback fires on a later tick"""
+    fired = []
+    wheel, now = _wheel()
+
+    def again() -> None:
+        fired.append("again")
+        wheel.schedule("a", now, fired.append, "retry")
+
+    wheel.schedule("a", now + 1, again)
+    wheel.advance(now + 1)
+    assert fired == ["again"] and "a" in wheel
+    wheel.advance(now + 2)
+    assert fired == ["again", "retry"]
+
+
+def test_wheel_fires_on_the_event_loop():
+    """Started on a loop, the wheel ticks by itself until stopped"""
+
+    async def main() -> list:
+        fired = []
+        wheel = TimerWheel(tick=0.05, slots=16)
+        wheel.start()
+        wheel.schedule("a", time.time() + 0.1, fired.append, "a")
+        await asyncio.sleep(0.3)
+        wheel.stop()
+        wheel.schedule("b", time.time(), fired.append, "b")
+        await asyncio.sleep(0.15)
+        return fired
+
+    assert asyncio.run(main()) == ["a"]
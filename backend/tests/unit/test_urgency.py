@@ -0,0 +1,46 @@
+"""Unit tests for the urgency lexicon matcher"""
+
+import re
+
+from app.services.urgency import UrgencyLexicon, _trie_pattern, urgency_lexicon
+
+
+def test_weighted_scores_and_phrases():
+    """Weights add up across matches; multi-word phrases and case don't matter"""
+    lexicon = UrgencyLexicon({"urgent": 1.0, "today": 0.5, "end of day": 0.5})
+
+    assert lexicon.score("URGENT: ship it") == 1.0
+    assert lexicon.score("Finish today, by End  of\nday") == 1.0
+    assert lexicon.score("urgently") == 0.0  # whole words only
+    assert lexicon.is_urgent("today, by end of day")
+    assert not lexicon.is_urgent("today")
+
+
+def test_negations():
+    """A negated term scores nothing, other terms in the text still count"""
+    lexicon = UrgencyLexicon({"urgent": 1.0, "important": 1.0}, negations=["not", "nicht"])
+
+    assert lexicon.score("not urgent") == 0.0
+    assert lexicon.score("not very urgent") == 0.0
+    assert lexicon.score("not at all very urgent") == 1.0  # beyond the negation gap
+    assert lexicon.score("not urgent, but important") == 1.0
+    assert lexicon.score("nothing urgent") == 1.0  # "not" only as a whole word
+
+
+def test_bundled_lexicon_covers_languages():
+    """The default lexicon flags urgency in several languages"""
+    lexicon = urgency_lexicon()
+
+    for text in ["Critical bug", "Sehr dringend", "Échéance demain", "Es urgente", "Scadenza"]:
+        assert lexicon.is_urgent(text), text
+    for text in ["Water plants", "nicht dringend", "this is not urgent"]:
+        assert not lexicon.is_urgent(text), text
+
+
+def test_trie_pattern_matches_plain_alternation():
+    """The factored pattern accepts exactly the listed phrases"""
+    phrases = ["deadline", "deadlines", "due", "dringend", "d"]
+    pattern = re.compile(rf"(?:{_trie_pattern(phrases)})\Z")
+
+    assert all(pattern.match(phrase) for phrase in phrases)
+    assert not any(pattern.match(text) for text in ["dead", "deadlin", "dues", ""])